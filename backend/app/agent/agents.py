@@ -1,20 +1,159 @@
 from __future__ import annotations
 
-import logging
+import asyncio
 import logging
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
-from app.agent.context import ScenarioContext
+from app.agent import heuristics
+from app.agent.context import CalendarEventContext, ScenarioContext
+from app.agent.prompt_builder import LEG_COLUMNS, POI_COLUMNS, STATION_COLUMNS, WEATHER_COLUMNS, PromptBuilder
 from app.agent.results import AgentResult
 from app.config import AGENT_CONFIG
-from app.services.llm_client import get_openai_client
+from app.services.gazetteer import estimate_road_km, normalize_place
+from app.services.llm_cache import LLM_CACHE
+from app.services.live_sessions import LIVE_SESSIONS, LiveSession, locate_on_route
+from app.services.llm_gateway import LLM_GATEWAY, PRIORITY_LIVE, PRIORITY_PLANNER, LLMRequest, LLMResponse
+from app.services.metrics import LLM_FALLBACKS
+from app.services.plan_executor import PlanExecutor
+from app.services.prefetch import RoutePrefetcher, quantize_km
 from app.services.planning import ResponseComposer, SimpleToolPlanner
 from app.services.tool_registry import ToolExecutionResult, ToolRegistry
 
 logger = logging.getLogger(__name__)
 
-logger = logging.getLogger(__name__)
+# Ranking only needs these outputs, so it can start while the other tools still run.
+_RANKING_INPUTS = ("RoutePlannerTool", "POINearRouteTool")
+_DELAY_BUCKET_MINUTES = 10
+# Spacing of route weather samples ahead of a tracked driver.
+LIVE_WEATHER_SAMPLE_KM = 20
+# Calendar events farther than this get a trip draft; closer ones only a reminder.
+TRIP_THRESHOLD_KM = 30
+# Completions that outlived their latency budget; kept referenced until they land in LLM_CACHE.
+_PENDING_COMPLETIONS: Set[asyncio.Task] = set()
+
+
+async def _cached_completion(
+    kind: str,
+    inputs: Dict[str, Any],
+    messages: List[Dict[str, str]],
+    max_completion_tokens: int,
+    budget_seconds: float,
+    fallback: Callable[[], str],
+    priority: int,
+) -> str:
+    """Run a chat completion unless an identical one (same model, settings and inputs) is cached.
+
+    If the completion does not finish within ``budget_seconds`` (or fails), ``fallback``
+    answers instead; a late completion keeps running and is cached for the next request.
+    """
+
+    key = LLM_CACHE.key_for(AGENT_CONFIG.model, AGENT_CONFIG.temperature, kind, inputs)
+    cached = LLM_CACHE.get(key)
+    if cached is not None:
+        logger.info("LLM %s served from cache", kind)
+        return cached
+    request = LLMRequest(
+        kind=kind,
+        messages=messages,
+        model=AGENT_CONFIG.model,
+        temperature=AGENT_CONFIG.temperature,
+        max_completion_tokens=max_completion_tokens,
+        timeout_seconds=AGENT_CONFIG.llm_request_timeout_seconds,
+    )
+    task = asyncio.create_task(_complete_and_cache(key, request, priority))
+    _PENDING_COMPLETIONS.add(task)
+    task.add_done_callback(_forget_completion)
+    try:
+        text = await asyncio.wait_for(asyncio.shield(task), timeout=budget_seconds)
+    except asyncio.TimeoutError:
+        logger.warning("LLM %s exceeded %.1fs budget, answering heuristically", kind, budget_seconds)
+        LLM_FALLBACKS.labels(kind, "timeout").inc()
+        return fallback()
+    except Exception as exc:
+        logger.warning("LLM %s failed, answering heuristically: %s", kind, exc)
+        LLM_FALLBACKS.labels(kind, "error").inc()
+        return fallback()
+    return text or fallback()
+
+
+async def _complete_and_cache(key: str, request: LLMRequest, priority: int) -> str:
+    response = await LLM_GATEWAY.complete(request, priority=priority)
+    LLM_CACHE.put(key, response.text, total_tokens=response.total_tokens, latency_seconds=response.latency_seconds)
+    return response.text
+
+
+async def _streamed_completion(
+    kind: str,
+    inputs: Dict[str, Any],
+    messages: List[Dict[str, str]],
+    max_completion_tokens: int,
+    budget_seconds: float,
+    fallback: Callable[[], str],
+    priority: int,
+) -> AsyncIterator[str]:
+    """Streaming counterpart of :func:`_cached_completion`.
+
+    A cached answer is yielded whole. Otherwise deltas are relayed as they arrive; if
+    the first one misses ``budget_seconds`` (or the stream fails before producing
+    anything) the fallback is yielded instead, while the stream keeps filling the cache.
+    """
+
+    key = LLM_CACHE.key_for(AGENT_CONFIG.model, AGENT_CONFIG.temperature, kind, inputs)
+    cached = LLM_CACHE.get(key)
+    if cached is not None:
+        yield cached
+        return
+    request = LLMRequest(
+        kind=kind,
+        messages=messages,
+        model=AGENT_CONFIG.model,
+        temperature=AGENT_CONFIG.temperature,
+        max_completion_tokens=max_completion_tokens,
+        timeout_seconds=AGENT_CONFIG.llm_request_timeout_seconds,
+    )
+    deltas: "asyncio.Queue[Any]" = asyncio.Queue()
+    task = asyncio.create_task(_stream_and_cache(key, request, priority, deltas))
+    _PENDING_COMPLETIONS.add(task)
+    task.add_done_callback(_forget_completion)
+    timeout: Optional[float] = budget_seconds
+    while True:
+        try:
+            item = await asyncio.wait_for(deltas.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("LLM %s stream exceeded %.1fs budget, answering heuristically", kind, budget_seconds)
+            LLM_FALLBACKS.labels(kind, "timeout").inc()
+            yield fallback()
+            return
+        if item is None:
+            return
+        if isinstance(item, Exception):
+            if timeout is not None:
+                logger.warning("LLM %s stream failed, answering heuristically: %s", kind, item)
+                LLM_FALLBACKS.labels(kind, "error").inc()
+                yield fallback()
+            return
+        # Only the first delta is bound by the budget; later ones arrive at model speed.
+        timeout = None
+        yield item
+
+
+async def _stream_and_cache(key: str, request: LLMRequest, priority: int, deltas: "asyncio.Queue[Any]") -> None:
+    response = LLMResponse(text="")
+    try:
+        async for delta in LLM_GATEWAY.stream(request, priority=priority, response=response):
+            deltas.put_nowait(delta)
+    except Exception as exc:
+        deltas.put_nowait(exc)
+        return
+    LLM_CACHE.put(key, response.text, total_tokens=response.total_tokens, latency_seconds=response.latency_seconds)
+    deltas.put_nowait(None)
+
+
+def _forget_completion(task: asyncio.Task) -> None:
+    _PENDING_COMPLETIONS.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.debug("Background LLM completion failed: %s", task.exception())
 
 
 @dataclass
@@ -30,9 +169,10 @@ class TripPlannerAgent:
     def __init__(self, registry: ToolRegistry):
         self.registry = registry
         self.planner = SimpleToolPlanner(registry)
+        self.executor = PlanExecutor(registry)
         self.composer = ResponseComposer()
 
-    def run(self, scenario: ScenarioContext) -> AgentResult:
+    async def run(self, scenario: ScenarioContext) -> AgentResult:
         plans = self.planner.plan(
             scenario.query,
             origin=scenario.origin,
@@ -40,13 +180,26 @@ class TripPlannerAgent:
             time_budget_minutes=scenario.time_budget_minutes,
             preferred_categories=scenario.preferences.get("categories") if scenario.preferences else None,
         )
-        tool_results: List[ToolExecutionResult] = []
-        for plan in plans:
-            tool_results.append(
-                self.registry.execute(plan.name, plan.arguments, rationale=plan.rationale)
-            )
-        text = self.composer.build_text(scenario.query, tool_results)
-        decision = self._rank_with_llm(tool_results, scenario)
+        ranking_outputs: Dict[str, Dict[str, Any]] = {}
+        ranking: Optional[asyncio.Task] = None
+
+        def start_ranking(result: ToolExecutionResult) -> None:
+            nonlocal ranking
+            if result.name not in _RANKING_INPUTS:
+                return
+            ranking_outputs[result.name] = result.output
+            if ranking is None and len(ranking_outputs) == len(_RANKING_INPUTS):
+                ranking = asyncio.create_task(self._rank_with_llm(ranking_outputs, scenario))
+
+        try:
+            tool_results = await self.executor.execute(plans, on_result=start_ranking)
+            text = self.composer.build_text(scenario.query, tool_results)
+            if ranking is None:
+                ranking = asyncio.create_task(self._rank_with_llm(ranking_outputs, scenario))
+            decision = await ranking
+        finally:
+            if ranking is not None and not ranking.done():
+                ranking.cancel()
         if decision:
             text = text + "\n\nAI vyber trasy:\n" + decision
         ctx = AgentContextPayload(
@@ -63,39 +216,43 @@ class TripPlannerAgent:
         )
         return AgentResult(text=text, context=ctx.__dict__)
 
-    def _rank_with_llm(self, tool_results: List[ToolExecutionResult], scenario: ScenarioContext) -> str:
+    async def _rank_with_llm(self, outputs: Dict[str, Dict[str, Any]], scenario: ScenarioContext) -> str:
         """Ask LLM to pick the best variant and count POI time budget."""
 
-        client = get_openai_client()
-        legs = []
-        for result in tool_results:
-            if result.name == "RoutePlannerTool":
-                legs = result.output.get("legs", [])
-        places = []
-        for result in tool_results:
-            if result.name == "POINearRouteTool":
-                places = result.output.get("suggestions", [])
+        legs = (outputs.get("RoutePlannerTool") or {}).get("legs", [])
+        places = (outputs.get("POINearRouteTool") or {}).get("suggestions", [])
         content = (
-            "Vyhodnot pripraveny draft trasy. Vyber najlepsi variant pre pouzivatela a odhadni kolko zastavok/POI sa stihne.\n"
-            f"Start: {scenario.origin} -> Ciel: {scenario.destination}\n"
-            f"Legs: {legs}\n"
-            f"POI navrhy: {places}\n"
-            "Vrat 2-3 vety v slovenčine: (1) ktoru trasu by si zvolil a preco, (2) kolko zastavok odporucas stihnut."
+            PromptBuilder("planner_ranking", AGENT_CONFIG.prompt_token_budget)
+            .line("Vyhodnot pripraveny draft trasy. Vyber najlepsi variant pre pouzivatela a odhadni kolko zastavok/POI sa stihne.")
+            .line(f"Start: {scenario.origin} -> Ciel: {scenario.destination}; casovy limit: {scenario.time_budget_minutes or '-'} min")
+            .table("Varianty", LEG_COLUMNS, legs, priority=2, min_rows=1)
+            .table("POI navrhy", POI_COLUMNS, places, priority=1, limit=8)
+            .line("Vrat 2-3 vety v slovenčine: (1) ktoru trasu by si zvolil a preco, (2) kolko zastavok odporucas stihnut.")
+            .build()
+        )
+        cache_inputs = {
+            "origin": scenario.origin,
+            "destination": scenario.destination,
+            "time_budget_minutes": scenario.time_budget_minutes,
+            "legs": legs,
+            "places": places,
+        }
+        return await _cached_completion(
+            "planner_ranking",
+            cache_inputs,
+            [
+                {"role": "system", "content": "Si TripGuardian, expert na trasy na Slovensku."},
+                {"role": "user", "content": content},
+            ],
+            max_completion_tokens=300,
+            budget_seconds=AGENT_CONFIG.planner_llm_budget_seconds,
+            priority=PRIORITY_PLANNER,
+            fallback=lambda: heuristics.rank_routes(
+                outputs.get("RoutePlannerTool") or {},
+                outputs.get("POINearRouteTool") or {},
+                scenario.time_budget_minutes,
+            ),
         )
-        try:
-            completion = client.chat.completions.create(
-                model=AGENT_CONFIG.model,
-                messages=[
-                    {"role": "system", "content": "Si TripGuardian, expert na trasy na Slovensku."},
-                    {"role": "user", "content": content},
-                ],
-                temperature=AGENT_CONFIG.temperature,
-                max_completion_tokens=300,
-            )
-            return completion.choices[0].message.content.strip()
-        except Exception as exc:  # pragma: no cover - network guard
-            logger.warning("LLM ranking failed: %s", exc)
-            return ""
 
 
 class CalendarWatcherAgent:
@@ -104,7 +261,7 @@ class CalendarWatcherAgent:
     def __init__(self, registry: ToolRegistry):
         self.registry = registry
 
-    def run(self, scenario: ScenarioContext) -> AgentResult:
+    async def run(self, scenario: ScenarioContext) -> AgentResult:
         if not scenario.event:
             return AgentResult(
                 text="Nebola dodana ziadna udalost v kalendari, nie je co planovat.",
@@ -113,17 +270,9 @@ class CalendarWatcherAgent:
 
         origin = scenario.user_profile.home_city if scenario.user_profile and scenario.user_profile.home_city else scenario.origin
         destination = scenario.event.location or scenario.destination
-        route = self.registry.execute(
-            "RoutePlannerTool",
-            {
-                "origin": origin,
-                "destination": destination,
-                "time_budget_minutes": 120,
-            },
-            rationale="Skusam odhadnut vzdialenost a cas k udalosti z kalendara.",
-        )
+        route = await self._plan_route(origin, destination)
 
-        needs_trip = (route.output or {}).get("distance_km", 0) and (route.output or {}).get("distance_km", 0) > 30
+        needs_trip = (route.output or {}).get("distance_km", 0) and (route.output or {}).get("distance_km", 0) > TRIP_THRESHOLD_KM
         text_lines = [
             f"Kalendár: {scenario.event.title} @ {scenario.event.location}",
             f"Odhad trasy {origin} -> {destination}: {route.output.get('distance_km')} km / {route.output.get('estimated_duration_minutes')} min.",
@@ -140,47 +289,106 @@ class CalendarWatcherAgent:
         )
         return AgentResult(text="\n".join(text_lines), context=ctx.__dict__)
 
+    async def run_batch(self, origin: str, events: List[CalendarEventContext]) -> AgentResult:
+        """Triage many calendar events at once.
 
-class LiveRouteAgent:
-    """Monitors active trip, checks weather + timing, and suggests adjustments."""
+        Events are deduplicated by normalized origin/destination. Each distinct pair is
+        first estimated offline from the gazetteer; full route planning runs only for
+        pairs estimated above ``TRIP_THRESHOLD_KM`` or not found in the gazetteer.
+        """
 
-    def __init__(self, registry: ToolRegistry):
-        self.registry = registry
+        pairs: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        for event in events:
+            pairs.setdefault((normalize_place(origin), normalize_place(event.location)), (origin, event.location))
+        estimates = {key: estimate_road_km(*names) for key, names in pairs.items()}
+        to_plan = [key for key, estimate in estimates.items() if estimate is None or estimate > TRIP_THRESHOLD_KM]
+        routes = dict(zip(to_plan, await asyncio.gather(*(self._plan_route(*pairs[key]) for key in to_plan))))
 
-    def run(self, scenario: ScenarioContext) -> AgentResult:
-        route_id = scenario.active_route_id or f"{scenario.origin}-{scenario.destination}"
-        waypoints = [scenario.current_location or scenario.origin, scenario.destination]
-        simulate_weather = None
-        if any(keyword in scenario.query.lower() for keyword in ["rain", "dazd", "burka", "storm"]):
-            simulate_weather = "storm" if any(k in scenario.query.lower() for k in ["burka", "storm"]) else "rain"
+        items: List[Dict[str, Any]] = []
+        for event in events:
+            key = (normalize_place(origin), normalize_place(event.location))
+            route_output = (routes[key].output or {}) if key in routes else {}
+            if route_output.get("distance_km"):
+                distance = route_output["distance_km"]
+                duration, source = route_output.get("estimated_duration_minutes"), "route_planner"
+            elif estimates[key] is not None:
+                distance, duration, source = round(estimates[key], 1), None, "estimate"
+            else:
+                distance, duration, source = None, None, "unknown"
+            items.append(
+                {
+                    "title": event.title,
+                    "location": event.location,
+                    "datetime": event.when,
+                    "origin": origin,
+                    "destination": pairs[key][1],
+                    "distance_km": distance,
+                    "duration_minutes": duration,
+                    "distance_source": source,
+                    "needs_trip": bool(distance and distance > TRIP_THRESHOLD_KM),
+                }
+            )
 
-        weather = self.registry.execute(
-            "WeatherTool",
-            {
-                "waypoints": waypoints,
-                "simulate": simulate_weather,
+        trips: Dict[str, List[Dict[str, Any]]] = {}
+        for item in items:
+            if item["needs_trip"]:
+                trips.setdefault(item["destination"], []).append(item)
+        text_lines = [
+            f"Kalendár: {len(events)} udalosti, {len(pairs)} roznych ciest, plne planovanie pre {len(to_plan)}.",
+        ]
+        for destination, group in trips.items():
+            titles = ", ".join(item["title"] for item in group[:3]) + (" ..." if len(group) > 3 else "")
+            text_lines.append(
+                f"- {destination} ({len(group)}x: {titles}): ~{group[0]['distance_km']} km, odporucam draft tripu."
+            )
+        if not trips:
+            text_lines.append("Vsetky udalosti su blizko, staci kratke upozornenie.")
+        return AgentResult(
+            text="\n".join(text_lines),
+            context={
+                "mode": "calendar_batch",
+                "scenario": {
+                    "origin": origin,
+                    "events": len(events),
+                    "unique_routes": len(pairs),
+                    "planned_routes": len(to_plan),
+                },
+                "events": items,
             },
-            rationale="Kontrolujem pocasie na dalsie useky.",
-        )
-        fuel = self.registry.execute(
-            "FuelStationsTool",
-            {"route_id": route_id, "energy_type": "petrol"},
-            rationale="Hladam moznosti tankovania na trase.",
         )
-        poi = self.registry.execute(
-            "POINearRouteTool",
-            {"route_id": route_id, "max_detour_km": 25},
-            rationale="Hladam rychle zastavky, keby sa treba odklonit.",
+
+    async def _plan_route(self, origin: str, destination: str) -> ToolExecutionResult:
+        return await self.registry.execute_async(
+            "RoutePlannerTool",
+            {
+                "origin": origin,
+                "destination": destination,
+                "time_budget_minutes": 120,
+            },
+            rationale="Skusam odhadnut vzdialenost a cas k udalosti z kalendara.",
         )
 
+
+class LiveRouteAgent:
+    """Monitors active trip, checks weather + timing, and suggests adjustments."""
+
+    def __init__(self, registry: ToolRegistry):
+        self.registry = registry
+        self.prefetcher = RoutePrefetcher(registry, plan=self._prefetch_plan)
+
+    async def run(self, scenario: ScenarioContext) -> AgentResult:
+        route_id = self._route_id(scenario)
+        session = await self._open_session(scenario, route_id)
+        weather, fuel, poi = await asyncio.gather(*self._tool_calls(scenario, route_id, session))
+        if session is not None:
+            self.prefetcher.schedule(session)
+
         delay = scenario.delay_minutes or 0
-        suggestions = []
-        if delay > 20:
-            suggestions.append("Si vo vacsom meskani, zvaz skratit dalsiu zastavku.")
-        if (weather.output or {}).get("forecast"):
-            first = weather.output["forecast"][0]
-            if first.get("condition") and "dazd" in first.get("condition", "").lower():
-                suggestions.append("Prsi na trase, priprav si alternativu pod strechou.")
+        suggestions = (
+            self._delay_suggestions(delay)
+            + self._weather_suggestions(weather.output)
+            + self._weather_ahead_suggestions(session)
+        )
 
         text_lines = [
             f"Aktivny trip: {route_id}",
@@ -194,7 +402,7 @@ class LiveRouteAgent:
         else:
             text_lines.append("Zatial ziadne zmeny netreba.")
 
-        ai_summary = self._llm_live_summary(
+        ai_summary = await self._llm_live_summary(
             scenario=scenario,
             weather=weather.output or {},
             fuel=fuel.output or {},
@@ -202,58 +410,315 @@ class LiveRouteAgent:
             suggestions=suggestions,
         )
         response_text = ai_summary if ai_summary else "\n".join(text_lines)
+        return AgentResult(
+            text=response_text,
+            context=self._context(scenario, route_id, [weather, fuel, poi], session, suggestions),
+        )
+
+    async def stream(self, scenario: ScenarioContext) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Yield ``(event, data)`` pairs as the live answer is assembled.
+
+        Rule-based suggestions come first, then each tool artifact as soon as it
+        finishes (plus any suggestion it triggers), then the announcement token by
+        token, and finally a ``done`` event with the same payload ``run`` returns.
+        """
+
+        route_id = self._route_id(scenario)
+        delay = scenario.delay_minutes or 0
+        session = await self._open_session(scenario, route_id)
+        suggestions = self._delay_suggestions(delay) + self._weather_ahead_suggestions(session)
+        yield "suggestions", {"route_id": route_id, "delay_minutes": delay, "suggestions": suggestions}
+
+        names = ("WeatherTool", "FuelStationsTool", "POINearRouteTool")
+        calls = self._tool_calls(scenario, route_id, session)
+        pending = {asyncio.ensure_future(call): name for call, name in zip(calls, names)}
+        results: Dict[str, ToolExecutionResult] = {}
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    results[pending.pop(task)] = result
+                    yield "artifact", {"agent": result.name, "summary": result.rationale, "artifacts": result.output}
+                    if result.name == "WeatherTool":
+                        extra = self._weather_suggestions(result.output)
+                        if extra:
+                            suggestions = suggestions + extra
+                            yield "suggestions", {"route_id": route_id, "delay_minutes": delay, "suggestions": suggestions}
+        finally:
+            for task in pending:
+                task.cancel()
+        if session is not None:
+            self.prefetcher.schedule(session)
+
+        weather, fuel, poi = (results[name] for name in names)
+        inputs, messages = self._live_summary_prompt(
+            scenario, weather.output or {}, fuel.output or {}, poi.output or {}, suggestions
+        )
+        parts: List[str] = []
+        async for delta in _streamed_completion(
+            "live_summary",
+            inputs,
+            messages,
+            max_completion_tokens=200,
+            budget_seconds=AGENT_CONFIG.live_llm_budget_seconds,
+            priority=PRIORITY_LIVE,
+            fallback=lambda: heuristics.live_announcement(
+                route_label=f"{scenario.origin} -> {scenario.destination}",
+                delay_minutes=delay,
+                forecast=(weather.output or {}).get("forecast") or [],
+                stations=(fuel.output or {}).get("stations") or [],
+                suggestions=suggestions,
+            ),
+        ):
+            parts.append(delta)
+            yield "token", {"text": delta}
+        yield "done", {
+            "text": "".join(parts).strip(),
+            "context": self._context(scenario, route_id, [weather, fuel, poi], session, suggestions),
+        }
+
+    def _route_id(self, scenario: ScenarioContext) -> str:
+        return scenario.active_route_id or f"{scenario.origin}-{scenario.destination}"
+
+    async def _open_session(self, scenario: ScenarioContext, route_id: str) -> Optional[LiveSession]:
+        """Live session of an active route, with the driver's position refreshed if it moved."""
+
+        if not scenario.active_route_id:
+            return None
+        # Without a session id, clients on the same route share one session.
+        session = LIVE_SESSIONS.touch(scenario.session_id or route_id, route_id)
+        session.destination = scenario.destination
+        location = scenario.current_location
+        if location and location != session.location:
+            # Off-route positions fall back to a linear scan and names may need geocoding.
+            progress = await asyncio.to_thread(locate_on_route, route_id, location)
+            session.location = location
+            if progress is not None:
+                session.move_to(progress)
+        return session
+
+    def _tool_calls(
+        self,
+        scenario: ScenarioContext,
+        route_id: str,
+        session: Optional[LiveSession] = None,
+    ) -> List[Awaitable[ToolExecutionResult]]:
+        """Weather, fuel and POI calls for the current position, in that order."""
+
+        waypoint = scenario.current_location or scenario.origin
+        ahead_of_km = None
+        if session is not None and session.position_km is not None:
+            # Snapped to the prefetch grid so these calls hit what the prefetcher warmed.
+            ahead_of_km = quantize_km(session.position_km)
+        simulate_weather = None
+        if any(keyword in scenario.query.lower() for keyword in ["rain", "dazd", "burka", "storm"]):
+            simulate_weather = "storm" if any(k in scenario.query.lower() for k in ["burka", "storm"]) else "rain"
+        arguments = self._live_arguments(route_id, waypoint, scenario.destination, ahead_of_km, simulate_weather)
+        return [
+            self.registry.execute_async(
+                "WeatherTool",
+                arguments["WeatherTool"],
+                rationale="Kontrolujem pocasie na dalsie useky.",
+            ),
+            self._corridor_call(
+                session,
+                "FuelStationsTool",
+                "stations",
+                arguments["FuelStationsTool"],
+                rationale="Hladam moznosti tankovania na trase.",
+            ),
+            self._corridor_call(
+                session,
+                "POINearRouteTool",
+                "suggestions",
+                arguments["POINearRouteTool"],
+                rationale="Hladam rychle zastavky, keby sa treba odklonit.",
+            ),
+        ]
+
+    @staticmethod
+    def _live_arguments(
+        route_id: str,
+        waypoint: Optional[str],
+        destination: Optional[str],
+        ahead_of_km: Optional[int] = None,
+        simulate_weather: Optional[str] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Tool arguments of one live update; shared with the prefetcher so memo keys match.
+
+        Once the driver is placed on the cached route, weather is sampled along the rest
+        of the route at arrival times instead of at the two endpoints.
+        """
+
+        corridor: Dict[str, Any] = {"ahead_of_km": ahead_of_km} if ahead_of_km is not None else {}
+        if ahead_of_km is not None:
+            weather = {"route_id": route_id, "sample_every_km": LIVE_WEATHER_SAMPLE_KM, **corridor}
+        else:
+            weather = {"waypoints": [waypoint, destination]}
+        return {
+            "WeatherTool": {**weather, "simulate": simulate_weather},
+            "FuelStationsTool": {"route_id": route_id, "energy_type": "petrol", **corridor},
+            "POINearRouteTool": {"route_id": route_id, "max_detour_km": 25, **corridor},
+        }
+
+    def _prefetch_plan(self, session: LiveSession, km: int) -> Dict[str, Dict[str, Any]]:
+        return self._live_arguments(session.route_id, None, session.destination, ahead_of_km=km)
+
+    async def _corridor_call(
+        self,
+        session: Optional[LiveSession],
+        name: str,
+        key: str,
+        arguments: Dict[str, Any],
+        rationale: str,
+    ) -> ToolExecutionResult:
+        """Reuse the session's previous result minus items already passed, else fetch the corridor ahead."""
 
+        if session is None:
+            return await self.registry.execute_async(name, arguments, rationale=rationale)
+        reused = session.reuse(name, key, rationale)
+        if reused is not None:
+            return reused
+        result = await self.registry.execute_async(name, arguments, rationale=rationale)
+        session.remember(result)
+        return result
+
+    @staticmethod
+    def _delay_suggestions(delay: int) -> List[str]:
+        if delay > 20:
+            return ["Si vo vacsom meskani, zvaz skratit dalsiu zastavku."]
+        return []
+
+    @staticmethod
+    def _weather_suggestions(weather: Optional[Dict[str, Any]]) -> List[str]:
+        forecast = (weather or {}).get("forecast") or []
+        if forecast and heuristics.is_wet(forecast[0]):
+            return ["Prsi na trase, priprav si alternativu pod strechou."]
+        # Route samples carry the arrival time, so rain further ahead can be announced early.
+        for entry in forecast[1:]:
+            if entry.get("eta_minutes") is not None and heuristics.is_wet(entry):
+                return [f"O ~{entry['eta_minutes']} min (km {round(entry['route_km'])}) sa ocakava {entry.get('condition')}."]
+        return []
+
+    @staticmethod
+    def _weather_ahead_suggestions(session: Optional[LiveSession]) -> List[str]:
+        """Warn about rain further ahead, from the corridor scheduler's forecasts."""
+
+        if session is None or session.position_km is None:
+            return []
+        for entry in session.weather_ahead:
+            if entry["route_km"] > session.position_km and heuristics.is_wet(entry):
+                distance = round(entry["route_km"] - session.position_km)
+                return [f"Asi o {distance} km sa ocakava {entry.get('condition')}, naplanuj zastavku pod strechou."]
+        return []
+
+    def _context(
+        self,
+        scenario: ScenarioContext,
+        route_id: str,
+        results: List[ToolExecutionResult],
+        session: Optional[LiveSession] = None,
+        suggestions: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        scenario_info: Dict[str, Any] = {
+            "origin": scenario.origin,
+            "destination": scenario.destination,
+            "route_id": route_id,
+            "current_location": scenario.current_location,
+            "suggestions": suggestions or [],
+        }
+        if session is not None:
+            scenario_info["session_id"] = session.session_id
+            scenario_info["session_updates"] = session.updates
+            weather_ahead = [
+                entry
+                for entry in session.weather_ahead
+                if session.position_km is None or entry["route_km"] >= session.position_km
+            ]
+            if weather_ahead:
+                scenario_info["weather_ahead"] = weather_ahead
+            if session.progress is not None:
+                scenario_info.update(session.progress.as_dict())
         ctx = AgentContextPayload(
             mode="live",
-            scenario={
-                "origin": scenario.origin,
-                "destination": scenario.destination,
-                "route_id": route_id,
-                "current_location": scenario.current_location,
-            },
+            scenario=scenario_info,
             sub_agents=[
-                {"agent": "WeatherTool", "summary": weather.rationale, "artifacts": weather.output},
-                {"agent": "FuelStationsTool", "summary": fuel.rationale, "artifacts": fuel.output},
-                {"agent": "POINearRouteTool", "summary": poi.rationale, "artifacts": poi.output},
+                {"agent": result.name, "summary": result.rationale, "artifacts": result.output}
+                for result in results
             ],
         )
-        return AgentResult(text=response_text, context=ctx.__dict__)
+        return ctx.__dict__
 
-    def _llm_live_summary(
+    def _live_summary_prompt(
         self,
         scenario: ScenarioContext,
         weather: Dict[str, Any],
         fuel: Dict[str, Any],
         poi: Dict[str, Any],
         suggestions: List[str],
-    ) -> str:
-        """Generate a JSON travel announcement for the current trip state."""
+    ) -> Tuple[Dict[str, Any], List[Dict[str, str]]]:
+        """Cache inputs and chat messages for the live announcement."""
 
-        client = get_openai_client()
         planned_stops = scenario.preferences.get("stops") if scenario.preferences else []
         content = (
-            "Vygeneruj oznam pre cestovatela v live mode ako JSON string. "
-            "Dodrz strukturu: {\"summary\": \"\", \"recommendation\": \"\", \"actions\": [\"...\"]}. "
-            "Maj 2-3 vety v poliach, slovensky. Ak je burka/dazd, odporuc preskocit outdoor zastavky (hrad, vyhladka), navrhni alternativu pod strechou.\n"
-            f"Trasa: {scenario.origin} -> {scenario.destination}, route_id={scenario.active_route_id or ''}\n"
-            f"Aktualna poloha: {scenario.current_location or 'nezadana'}, meskanie: {scenario.delay_minutes} min\n"
-            f"Pocasie: {weather.get('forecast')}\n"
-            f"Stanice: {fuel.get('stations', [])[:3]}\n"
-            f"POI: {poi.get('suggestions', [])[:3]}\n"
-            f"Planovane zastavky: {planned_stops}\n"
-            f"Predbezne doporucenia: {suggestions}"
-        )
-        try:
-            completion = client.chat.completions.create(
-                model=AGENT_CONFIG.model,
-                messages=[
-                    {"role": "system", "content": "Si TripGuardian, strucny live copilot. Bud konkretna a akcna."},
-                    {"role": "user", "content": content},
-                ],
-                temperature=AGENT_CONFIG.temperature,
-                max_completion_tokens=200,
+            PromptBuilder("live_summary", AGENT_CONFIG.prompt_token_budget)
+            .line(
+                "Vygeneruj oznam pre cestovatela v live mode ako JSON string. "
+                "Dodrz strukturu: {\"summary\": \"\", \"recommendation\": \"\", \"actions\": [\"...\"]}. "
+                "Maj 2-3 vety v poliach, slovensky. Ak je burka/dazd, odporuc preskocit outdoor zastavky (hrad, vyhladka), navrhni alternativu pod strechou."
             )
-            return completion.choices[0].message.content.strip()
-        except Exception as exc:  # pragma: no cover - network guard
-            logger.warning("LLM live summary failed: %s", exc)
-            return ""
+            .line(f"Trasa: {scenario.origin} -> {scenario.destination}, route_id={scenario.active_route_id or ''}")
+            .line(f"Aktualna poloha: {scenario.current_location or 'nezadana'}, meskanie: {scenario.delay_minutes} min")
+            .table("Pocasie", WEATHER_COLUMNS, weather.get("forecast") or [], priority=3, min_rows=1)
+            .table("Stanice", STATION_COLUMNS, fuel.get("stations", []), priority=1, limit=3)
+            .table("POI", POI_COLUMNS, poi.get("suggestions", []), priority=0, limit=3)
+            .line(f"Planovane zastavky: {', '.join(map(str, planned_stops or [])) or '-'}")
+            .line(f"Predbezne doporucenia: {' '.join(suggestions) or '-'}")
+            .build()
+        )
+        # Delay is bucketed so a few minutes of drift still reuses the announcement.
+        cache_inputs = {
+            "origin": scenario.origin,
+            "destination": scenario.destination,
+            "route_id": scenario.active_route_id,
+            "current_location": scenario.current_location,
+            "delay_bucket": (scenario.delay_minutes or 0) // _DELAY_BUCKET_MINUTES,
+            "forecast": weather.get("forecast"),
+            "stations": fuel.get("stations", [])[:3],
+            "poi": poi.get("suggestions", [])[:3],
+            "planned_stops": planned_stops,
+            "suggestions": suggestions,
+        }
+        messages = [
+            {"role": "system", "content": "Si TripGuardian, strucny live copilot. Bud konkretna a akcna."},
+            {"role": "user", "content": content},
+        ]
+        return cache_inputs, messages
+
+    async def _llm_live_summary(
+        self,
+        scenario: ScenarioContext,
+        weather: Dict[str, Any],
+        fuel: Dict[str, Any],
+        poi: Dict[str, Any],
+        suggestions: List[str],
+    ) -> str:
+        """Generate a JSON travel announcement for the current trip state."""
+
+        cache_inputs, messages = self._live_summary_prompt(scenario, weather, fuel, poi, suggestions)
+        return await _cached_completion(
+            "live_summary",
+            cache_inputs,
+            messages,
+            max_completion_tokens=200,
+            budget_seconds=AGENT_CONFIG.live_llm_budget_seconds,
+            priority=PRIORITY_LIVE,
+            fallback=lambda: heuristics.live_announcement(
+                route_label=f"{scenario.origin} -> {scenario.destination}",
+                delay_minutes=scenario.delay_minutes or 0,
+                forecast=weather.get("forecast") or [],
+                stations=fuel.get("stations") or [],
+                suggestions=suggestions,
+            ),
+        )
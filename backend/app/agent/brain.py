@@ -3,7 +3,7 @@ from __future__ import annotations
 import asyncio
 import logging
 import re
-from typing import List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from app.agent.agents import CalendarWatcherAgent, LiveRouteAgent, TripPlannerAgent
 from app.agent.context import CalendarEventContext, ScenarioContext, UserProfileContext
@@ -11,11 +11,16 @@ from app.agent.results import AgentResult
 from app.agent.sub_agents import (
     StopsAdvisorAgent,
     SubAgentResult,
+    ToolScratchpad,
     TravelPlannerAgent,
     WeatherAdvisorAgent,
 )
-from app.api.schemas import CalendarEvent, QueryRequest, UserProfileInput
+from app.api.schemas import CalendarBatchRequest, CalendarEvent, QueryRequest, UserProfileInput
 from app.config import APP_CONFIG
+from app.services.gazetteer import normalize_place
+from app.services.llm_gateway import track_tokens
+from app.services.tool_result_cache import canonical_arguments
+from app.services.metrics import AGENT_ERRORS, AGENT_LATENCY
 from app.services.tool_registry import ToolRegistry
 
 logger = logging.getLogger(__name__)
@@ -48,13 +53,74 @@ class AgentBrain:
         scenario = self._build_scenario(request)
         mode = (request.mode or "planner").lower()
         logger.info("Agent mode=%s, scenario=%s", mode, scenario.describe())
+        with AGENT_LATENCY.labels(mode).time(), track_tokens() as ledger:
+            try:
+                result = await self._dispatch(mode, scenario)
+            except Exception:
+                AGENT_ERRORS.labels(mode).inc()
+                raise
+        if ledger.calls:
+            logger.info("LLM spotreba: %d volani, %d tokenov", ledger.calls, ledger.prompt_tokens + ledger.completion_tokens)
+            result.context["llm_usage"] = ledger.as_dict()
+        return result
+
+    def request_key(self, request: QueryRequest) -> str:
+        """Normalized request; equal keys produce the same answer.
+
+        The query text stays part of the key: planning and live mode read keywords from
+        it (time budget, simulated weather) and the LLM sees it verbatim.
+        """
 
+        scenario = self._build_scenario(request)
+        return canonical_arguments(
+            {
+                "mode": (request.mode or "planner").lower(),
+                "query": " ".join(scenario.query.lower().split()),
+                "origin": normalize_place(scenario.origin),
+                "destination": normalize_place(scenario.destination),
+                "time_budget_minutes": scenario.time_budget_minutes,
+                "preferences": scenario.preferences,
+                "current_location": scenario.current_location,
+                "active_route_id": scenario.active_route_id,
+                "session_id": scenario.session_id,
+                "delay_minutes": scenario.delay_minutes,
+                "event": [scenario.event.title, scenario.event.when] if scenario.event else None,
+                "user_profile": scenario.user_profile.__dict__ if scenario.user_profile else None,
+            }
+        )
+
+    async def stream_live(self, request: QueryRequest) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Streaming variant of the ``live`` mode, see :meth:`LiveRouteAgent.stream`."""
+
+        scenario = self._build_scenario(request)
+        logger.info("Agent mode=live (stream), scenario=%s", scenario.describe())
+        with AGENT_LATENCY.labels("live_stream").time():
+            try:
+                async for event in self.live_agent.stream(scenario):
+                    yield event
+            except Exception:
+                AGENT_ERRORS.labels("live_stream").inc()
+                raise
+
+    async def process_calendar_batch(self, request: CalendarBatchRequest) -> AgentResult:
+        profile = request.user_profile
+        origin = (profile.home_city if profile and profile.home_city else None) or request.origin or "Kosice"
+        events = [self._build_event_context(event) for event in request.events]
+        logger.info("Agent mode=calendar_batch, %d udalosti z %s", len(events), origin)
+        with AGENT_LATENCY.labels("calendar_batch").time():
+            try:
+                return await self.calendar_agent.run_batch(origin, events)
+            except Exception:
+                AGENT_ERRORS.labels("calendar_batch").inc()
+                raise
+
+    async def _dispatch(self, mode: str, scenario: ScenarioContext) -> AgentResult:
         if mode == "planner":
-            return self.trip_planner_agent.run(scenario)
+            return await self.trip_planner_agent.run(scenario)
         if mode == "calendar":
-            return self.calendar_agent.run(scenario)
+            return await self.calendar_agent.run(scenario)
         if mode == "live":
-            return self.live_agent.run(scenario)
+            return await self.live_agent.run(scenario)
 
         # fallback to legacy multi-agent demo
         sub_results = await self._run_sub_agents(scenario)
@@ -75,8 +141,11 @@ class AgentBrain:
         return AgentResult(text=final_text, context=context_payload)
 
     async def _run_sub_agents(self, scenario: ScenarioContext) -> List[SubAgentResult]:
-        tasks = [agent.run(scenario) for agent in self.sub_agents]
+        scratchpad = ToolScratchpad()
+        tasks = [agent.run(scenario, scratchpad) for agent in self.sub_agents]
         results = await asyncio.gather(*tasks, return_exceptions=True)
+        if scratchpad.reused:
+            logger.info("Pod-agenti zdielali %d volani nastrojov", scratchpad.reused)
         normalized: List[SubAgentResult] = []
         for agent, result in zip(self.sub_agents, results):
             if isinstance(result, Exception):
@@ -133,6 +202,7 @@ class AgentBrain:
             destination=destination or "Bratislava",
             current_location=request.current_location,
             active_route_id=request.active_route_id,
+            session_id=request.session_id,
             delay_minutes=request.delay_minutes or 0,
             time_budget_minutes=time_budget,
             event=event_ctx,
@@ -27,6 +27,7 @@ class ScenarioContext:
     destination: str
     current_location: Optional[str] = None
     active_route_id: Optional[str] = None
+    session_id: Optional[str] = None
     delay_minutes: int = 0
     time_budget_minutes: Optional[int] = None
     event: Optional[CalendarEventContext] = None
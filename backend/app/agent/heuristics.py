@@ -0,0 +1,123 @@
+"""Deterministic stand-ins for the agent LLM calls.
+
+Used when an LLM call misses its latency budget (or fails): the answers are built
+only from tool outputs, so they are instant and always available.
+"""
+from __future__ import annotations
+
+import json
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+# Time a driver typically spends at one stop, on top of the detour itself.
+STOP_DWELL_MINUTES = 30
+# Detours are mostly on regional roads; 1 km off route ~ 1 minute each way.
+DETOUR_MINUTES_PER_KM = 2
+
+
+def pick_route(route: Dict[str, Any], time_budget_minutes: Optional[int]) -> Optional[Dict[str, Any]]:
+    """Choose the planner leg: the attraction-rich variant if its extra time fits the budget, else the fastest."""
+
+    legs = _timed_legs(route)
+    if not legs:
+        return None
+    fastest = min(legs, key=lambda leg: leg["duration_minutes"])
+    recommended = (route.get("recommendations") or {}).get("best_for_attractions")
+    for leg in legs:
+        if leg.get("name") == recommended and leg is not fastest:
+            extra = leg["duration_minutes"] - fastest["duration_minutes"]
+            if time_budget_minutes and extra <= time_budget_minutes / 2:
+                return leg
+    return fastest
+
+
+def _timed_legs(route: Dict[str, Any]) -> List[Dict[str, Any]]:
+    legs = [leg for leg in route.get("legs") or [] if leg.get("duration_minutes") is not None]
+    if not legs and route.get("estimated_duration_minutes") is not None:
+        # Payloads without per-variant timing still carry the best route's totals.
+        legs = [
+            {
+                "name": (route.get("recommendations") or {}).get("fastest_route") or "Trasa",
+                "distance_km": route.get("distance_km"),
+                "duration_minutes": route.get("estimated_duration_minutes"),
+            }
+        ]
+    return legs
+
+
+def stops_within_budget(suggestions: List[Dict[str, Any]], budget_minutes: Optional[float]) -> List[Dict[str, Any]]:
+    """Greedily take the closest POIs while their detour and dwell time fit the budget."""
+
+    if not budget_minutes or budget_minutes <= 0:
+        return []
+    chosen: List[Dict[str, Any]] = []
+    spent = 0.0
+    for poi in sorted(suggestions, key=lambda item: item.get("detour_km") or 0):
+        cost = (poi.get("detour_km") or 0) * DETOUR_MINUTES_PER_KM + STOP_DWELL_MINUTES
+        if spent + cost > budget_minutes:
+            break
+        chosen.append(poi)
+        spent += cost
+    return chosen
+
+
+def rank_routes(
+    route: Dict[str, Any],
+    poi: Dict[str, Any],
+    time_budget_minutes: Optional[int],
+) -> str:
+    leg = pick_route(route, time_budget_minutes)
+    if leg is None:
+        return ""
+    fastest_minutes = min(item["duration_minutes"] for item in _timed_legs(route))
+    slack = (time_budget_minutes or 0) - (leg["duration_minutes"] - fastest_minutes)
+    stops = stops_within_budget(poi.get("suggestions") or [], slack)
+    lines = [
+        f"Odporucam variant '{leg.get('name', 'Trasa')}' (~{leg['duration_minutes']} min, {leg.get('distance_km')} km)."
+    ]
+    if stops:
+        names = ", ".join(stop.get("name", "zastavka") for stop in stops)
+        lines.append(f"V casovom limite sa stihne {len(stops)} zastav{'ka' if len(stops) == 1 else 'ky'}: {names}.")
+    elif time_budget_minutes:
+        lines.append("Na dalsie zastavky v casovom limite nezostava cas.")
+    else:
+        lines.append("Bez zadaneho casoveho limitu odporucam najviac jednu kratku zastavku.")
+    return " ".join(lines)
+
+
+def live_announcement(
+    route_label: str,
+    delay_minutes: int,
+    forecast: List[Dict[str, Any]],
+    stations: List[Dict[str, Any]],
+    suggestions: List[str],
+) -> str:
+    """JSON announcement with the same shape the live LLM prompt asks for."""
+
+    wet = [entry for entry in forecast if is_wet(entry)]
+    if wet:
+        summary = f"Na trase {route_label} sa ocakava {wet[0].get('condition')} ({wet[0].get('location')})."
+    else:
+        summary = f"Na trase {route_label} je pocasie bez vyraznych zrazok."
+    if delay_minutes:
+        summary += f" Meskanie {delay_minutes} min."
+    actions = list(suggestions)
+    if wet:
+        actions.append("Vynechaj outdoor zastavky a zvol alternativu pod strechou.")
+    if stations:
+        actions.append(f"Najblizsie tankovanie: {stations[0].get('name', 'cerpacia stanica')}.")
+    recommendation = actions[0] if actions else "Pokracuj podla planu."
+    return json.dumps(
+        {"summary": summary, "recommendation": recommendation, "actions": actions},
+        ensure_ascii=False,
+    )
+
+
+_WET_WORDS = ("dazd", "burk", "snez", "prehank", "mrhol")
+
+
+def is_wet(entry: Dict[str, Any]) -> bool:
+    # Open-Meteo conditions carry diacritics ("dážď"), simulated ones do not.
+    condition = unicodedata.normalize("NFKD", str(entry.get("condition") or "").lower())
+    condition = "".join(char for char in condition if not unicodedata.combining(char))
+    return (entry.get("precip_probability") or 0) >= 60 or any(word in condition for word in _WET_WORDS)
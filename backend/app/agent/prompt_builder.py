@@ -0,0 +1,154 @@
+"""Compact, token-budgeted rendering of tool outputs for agent LLM prompts.
+
+Tool payloads are rendered as small pipe-separated tables instead of Python reprs
+(waypoint lists and nested locations never reach the model). Token counts are
+estimated locally; when a prompt exceeds its budget, optional columns and then
+trailing rows of the lowest-priority tables are dropped until it fits.
+"""
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from app.services.metrics import PROMPT_TOKENS, PROMPT_TRUNCATIONS
+
+logger = logging.getLogger(__name__)
+
+# ~4 characters per token is a good enough estimate for mixed Slovak/English text.
+_CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / _CHARS_PER_TOKEN)
+
+
+@dataclass
+class Column:
+    name: str
+    key: str
+    optional: bool = False
+
+
+@dataclass
+class _Table:
+    title: str
+    columns: List[Column]
+    rows: List[Dict[str, Any]]
+    priority: int
+    min_rows: int
+
+    def render(self) -> str:
+        if not self.rows:
+            return f"{self.title}: -"
+        lines = [f"{self.title} ({'|'.join(column.name for column in self.columns)}):"]
+        for row in self.rows:
+            lines.append("|".join(_cell(row.get(column.key)) for column in self.columns))
+        return "\n".join(lines)
+
+    def drop_optional_column(self) -> bool:
+        for idx in range(len(self.columns) - 1, -1, -1):
+            if self.columns[idx].optional:
+                del self.columns[idx]
+                return True
+        return False
+
+    def drop_row(self) -> bool:
+        if len(self.rows) > self.min_rows:
+            self.rows.pop()
+            return True
+        return False
+
+
+@dataclass
+class PromptBuilder:
+    """Assemble a user prompt from fixed lines and prioritized tables.
+
+    Lines are always kept. Tables with a lower ``priority`` are trimmed first; rows
+    are expected in order of relevance, so truncation removes them from the end.
+    """
+
+    kind: str
+    budget_tokens: int
+    _parts: List[Any] = field(default_factory=list)
+
+    def line(self, text: str) -> "PromptBuilder":
+        self._parts.append(text)
+        return self
+
+    def table(
+        self,
+        title: str,
+        columns: Sequence[Column],
+        rows: Iterable[Dict[str, Any]],
+        priority: int = 0,
+        limit: Optional[int] = None,
+        min_rows: int = 0,
+    ) -> "PromptBuilder":
+        selected = list(rows or [])
+        if limit is not None:
+            selected = selected[:limit]
+        self._parts.append(_Table(title, list(columns), selected, priority, min_rows))
+        return self
+
+    def build(self) -> str:
+        tables = sorted((part for part in self._parts if isinstance(part, _Table)), key=lambda t: t.priority)
+        text = self._render()
+        tokens = estimate_tokens(text)
+        truncated = False
+        while tokens > self.budget_tokens and self._trim(tables):
+            truncated = True
+            text = self._render()
+            tokens = estimate_tokens(text)
+        if truncated:
+            PROMPT_TRUNCATIONS.labels(self.kind).inc()
+            logger.info("Prompt %s truncated to ~%d tokens (budget %d)", self.kind, tokens, self.budget_tokens)
+        PROMPT_TOKENS.labels(self.kind).observe(tokens)
+        return text
+
+    def _render(self) -> str:
+        return "\n".join(part.render() if isinstance(part, _Table) else part for part in self._parts)
+
+    @staticmethod
+    def _trim(tables: List[_Table]) -> bool:
+        for table in tables:
+            if table.drop_optional_column():
+                return True
+        for table in tables:
+            if table.drop_row():
+                return True
+        return False
+
+
+def _cell(value: Any) -> str:
+    if value is None or value == "":
+        return "-"
+    if isinstance(value, float):
+        return f"{value:g}"
+    if isinstance(value, (list, tuple)):
+        return ",".join(_cell(item) for item in value) or "-"
+    return str(value).replace("|", "/").replace("\n", " ")
+
+
+LEG_COLUMNS = [
+    Column("variant", "instructions"),
+    Column("km", "distance_km"),
+]
+POI_COLUMNS = [
+    Column("nazov", "name"),
+    Column("odbocka_km", "detour_km"),
+    Column("typ", "reason", optional=True),
+]
+WEATHER_COLUMNS = [
+    Column("miesto", "location"),
+    Column("stav", "condition"),
+    Column("zrazky_%", "precip_probability"),
+    Column("teplota_c", "temp_c", optional=True),
+    Column("eta_min", "eta_minutes", optional=True),
+]
+STATION_COLUMNS = [
+    Column("nazov", "name"),
+    Column("eta_min", "eta_from_start_minutes"),
+    Column("vybava", "amenities", optional=True),
+]
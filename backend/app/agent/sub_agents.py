@@ -2,14 +2,57 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from dataclasses import dataclass
-from typing import Any, Dict
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional
 
 from app.agent.context import ScenarioContext
 from app.services.tool_registry import ToolExecutionResult, ToolRegistry
+from app.services.tool_result_cache import canonical_arguments
 
 logger = logging.getLogger(__name__)
 
+# Sized pool reserved for sub-agent tool calls, separate from the loop's default executor.
+SUB_AGENT_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SUB_AGENT_WORKERS", "8")),
+    thread_name_prefix="sub-agent",
+)
+
+
+class ToolScratchpad:
+    """Per-request record of tool calls shared by all sub-agents of that request.
+
+    The first call with a given tool name and arguments starts the execution; any
+    other sub-agent asking for the same call awaits that same task instead of
+    running the tool again.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.reused = 0
+
+    async def call(
+        self,
+        registry: ToolRegistry,
+        name: str,
+        arguments: Dict[str, Any],
+        rationale: str,
+    ) -> ToolExecutionResult:
+        key = f"{name}:{canonical_arguments(arguments)}"
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                registry.execute_async(name, arguments, rationale=rationale, executor=SUB_AGENT_EXECUTOR)
+            )
+            self._calls[key] = task
+        else:
+            self.reused += 1
+            logger.debug("Reusing %s result from request scratchpad", name)
+        # Shield so one cancelled sub-agent does not cancel the call for the others.
+        result = await asyncio.shield(task)
+        return result if result.rationale == rationale else replace(result, rationale=rationale)
+
 
 @dataclass
 class SubAgentResult:
@@ -25,31 +68,40 @@ class BaseSubAgent:
     def __init__(self, registry: ToolRegistry) -> None:
         self.registry = registry
 
-    async def run(self, context: ScenarioContext) -> SubAgentResult:
+    async def run(self, context: ScenarioContext, scratchpad: Optional[ToolScratchpad] = None) -> SubAgentResult:
         raise NotImplementedError
 
-    async def _call_tool(self, name: str, arguments: Dict[str, Any], rationale: str) -> ToolExecutionResult:
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(
-            None,
-            lambda: self.registry.execute(name=name, arguments=arguments, rationale=rationale),
-        )
+    async def _call_tool(
+        self,
+        name: str,
+        arguments: Dict[str, Any],
+        rationale: str,
+        scratchpad: Optional[ToolScratchpad] = None,
+    ) -> ToolExecutionResult:
+        if scratchpad is not None:
+            return await scratchpad.call(self.registry, name, arguments, rationale)
+        return await self.registry.execute_async(name, arguments, rationale=rationale, executor=SUB_AGENT_EXECUTOR)
+
+    def _route_arguments(self, context: ScenarioContext) -> Dict[str, Any]:
+        # Shared by every sub-agent so the scratchpad sees one identical route call.
+        return {
+            "origin": context.origin,
+            "destination": context.destination,
+            "time_budget_minutes": 120,
+        }
 
 
 class TravelPlannerAgent(BaseSubAgent):
     name = "TravelPlanner"
     description = "Plánuje dopravu a harmonogram cesty."
 
-    async def run(self, context: ScenarioContext) -> SubAgentResult:
+    async def run(self, context: ScenarioContext, scratchpad: Optional[ToolScratchpad] = None) -> SubAgentResult:
         logger.info("%s analyzuje trasu %s -> %s", self.name, context.origin, context.destination)
         route = await self._call_tool(
             "RoutePlannerTool",
-            {
-                "origin": context.origin,
-                "destination": context.destination,
-                "time_budget_minutes": 120,
-            },
+            self._route_arguments(context),
             "Vyhodnocujem najlepšiu trasu",
+            scratchpad,
         )
         fuel = await self._call_tool(
             "FuelStationsTool",
@@ -58,6 +110,7 @@ class TravelPlannerAgent(BaseSubAgent):
                 "energy_type": "petrol",
             },
             "Hľadám tankovanie",
+            scratchpad,
         )
 
         summary = (
@@ -76,12 +129,13 @@ class WeatherAdvisorAgent(BaseSubAgent):
     name = "WeatherAdvisor"
     description = "Monitoruje počasie a odporúča oblečenie."
 
-    async def run(self, context: ScenarioContext) -> SubAgentResult:
+    async def run(self, context: ScenarioContext, scratchpad: Optional[ToolScratchpad] = None) -> SubAgentResult:
         logger.info("%s kontroluje počasie pre %s a %s", self.name, context.origin, context.destination)
         weather = await self._call_tool(
             "WeatherTool",
             {"waypoints": [context.origin, context.destination]},
             "Overujem predpoveď",
+            scratchpad,
         )
         suggestions = self._build_clothing_tips(weather.output)
         summary = "Počítaj s podmienkami: " + ", ".join(
@@ -109,23 +163,19 @@ class StopsAdvisorAgent(BaseSubAgent):
     name = "StopsAdvisor"
     description = "Navrhuje zastávky, jedlo a body záujmu."
 
-    async def run(self, context: ScenarioContext) -> SubAgentResult:
+    async def run(self, context: ScenarioContext, scratchpad: Optional[ToolScratchpad] = None) -> SubAgentResult:
         logger.info("%s hľadá zastávky na trase %s -> %s", self.name, context.origin, context.destination)
-        poi = await self._call_tool(
-            "POINearRouteTool",
-            {
-                "route_id": f"{context.origin}-{context.destination}",
-                "max_detour_km": 25,
-            },
-            "Hľadám rýchle zaujímavosti",
-        )
-        places = await self._call_tool(
-            "PlacesSearchTool",
-            {
-                "location": context.destination,
-                "categories": ["food", "coffee", "culture"],
-            },
-            "Hľadám jedlo a kávu",
+        poi, places = await asyncio.gather(
+            self._poi_after_route(context, scratchpad),
+            self._call_tool(
+                "PlacesSearchTool",
+                {
+                    "location": context.destination,
+                    "categories": ["food", "coffee", "culture"],
+                },
+                "Hľadám jedlo a kávu",
+                scratchpad,
+            ),
         )
 
         summary = "Tipy na cestu pripravené: "
@@ -133,3 +183,24 @@ class StopsAdvisorAgent(BaseSubAgent):
         summary += f"{len(places.output.get('places', []))} miest na jedlo."
         artifacts = {"poi": poi.output, "places": places.output}
         return SubAgentResult(agent=self.name, summary=summary, artifacts=artifacts)
+
+    async def _poi_after_route(
+        self, context: ScenarioContext, scratchpad: Optional[ToolScratchpad]
+    ) -> ToolExecutionResult:
+        # Join the TravelPlanner's route call so POI lookup finds the route cache warm
+        # instead of hydrating it with a second computation; places search does not wait.
+        await self._call_tool(
+            "RoutePlannerTool",
+            self._route_arguments(context),
+            "Zdielam trasu s TravelPlanner agentom",
+            scratchpad,
+        )
+        return await self._call_tool(
+            "POINearRouteTool",
+            {
+                "route_id": f"{context.origin}-{context.destination}",
+                "max_detour_km": 25,
+            },
+            "Hľadám rýchle zaujímavosti",
+            scratchpad,
+        )
@@ -5,11 +5,14 @@ from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
+# CalendarEvent has a field called ``datetime``, which shadows the type inside its class body.
+DateTime = datetime
+
 
 class CalendarEvent(BaseModel):
     title: str
     location: str
-    datetime: Optional[datetime] = None
+    datetime: Optional[DateTime] = None
     notes: Optional[str] = None
 
     @field_validator("datetime", mode="before")
@@ -90,11 +93,16 @@ class QueryRequest(BaseModel):
         None, description="Strukturovany trip payload z frontendu (start/destination/stops/preferences)."
     )
     current_location: Optional[str] = Field(
-        None, description="Volitelne: aktualna poloha pre live agenta."
+        None, description="Volitelne: aktualna poloha pre live agenta (nazov miesta alebo \"lat,lon\")."
     )
     active_route_id: Optional[str] = Field(
         None, description="Volitelne: identifikator aktivnej trasy pre live agenta."
     )
+    session_id: Optional[str] = Field(
+        None,
+        max_length=128,
+        description="Volitelne: identifikator jazdy/klienta pre live agenta; bez neho sa session zdiela podla trasy.",
+    )
     delay_minutes: Optional[int] = Field(0, description="Volitelne: meskanie v minutach pre live agenta.")
     calendar_event: Optional["CalendarEvent"] = Field(
         None, description="Volitelna udalost z kalendara, ktora spusta planovanie.",
@@ -104,10 +112,35 @@ class QueryRequest(BaseModel):
     )
 
 
+class CalendarBatchRequest(BaseModel):
+    events: List[CalendarEvent] = Field(..., min_length=1, max_length=500, description="Udalosti z kalendara na triedenie.")
+    origin: Optional[str] = Field(None, description="Odkial sa cestuje; inak user_profile.home_city alebo Kosice.")
+    user_profile: Optional[UserProfileInput] = Field(None, description="Zachytene preferencie pouzivatela.")
+
+
+class CalendarTripEstimate(BaseModel):
+    title: str
+    location: str
+    when: Optional[datetime] = Field(None, alias="datetime")
+    origin: str
+    destination: str
+    distance_km: Optional[float] = None
+    duration_minutes: Optional[float] = None
+    distance_source: Literal["route_planner", "estimate", "unknown"]
+    needs_trip: bool
+
+
+class CalendarBatchResponse(BaseModel):
+    text: str
+    scenario: Dict[str, Any]
+    events: List[CalendarTripEstimate]
+
+
 class AgentContext(BaseModel):
     mode: str
     scenario: Dict[str, Any]
     sub_agents: List["SubAgentReport"]
+    llm_usage: Optional[Dict[str, Any]] = None
 
 
 class QueryResponse(BaseModel):
@@ -115,6 +148,17 @@ class QueryResponse(BaseModel):
     context: AgentContext
 
 
+class JobStatus(BaseModel):
+    job_id: str
+    status: Literal["queued", "running", "done", "failed"]
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    attached: int = Field(0, description="Kolko dalsich rovnakych poziadaviek sa pripojilo k tomuto jobu.")
+    result: Optional[QueryResponse] = None
+    error: Optional[str] = None
+
+
 class SubAgentReport(BaseModel):
     agent: str
     summary: str
@@ -1,13 +1,40 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
+import os
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Dict, Tuple, TypeVar
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import ValidationError
 
 from app.agent.brain import AgentBrain
-from app.api.schemas import AgentContext, QueryRequest, QueryResponse, SubAgentReport
+from app.agent.results import AgentResult
+from app.api.schemas import (
+    AgentContext,
+    CalendarBatchRequest,
+    CalendarBatchResponse,
+    JobStatus,
+    QueryRequest,
+    QueryResponse,
+    SubAgentReport,
+)
 from app.config import APP_CONFIG
 from app.logging_config import setup_logging
+from app.services.circuit_breaker import BREAKERS, CLOSED, HALF_OPEN, OPEN
+from app.services.corridor_scheduler import CorridorScheduler
+from app.services.forecast_cache import FORECAST_CACHE, ForecastWarmer
+from app.services.jobs import JOBS, JobQueueFull
+from app.services.live_feed import LiveFeed
+from app.services.live_sessions import LIVE_SESSIONS
+from app.services.llm_cache import LLM_CACHE
+from app.services.llm_gateway import LLM_GATEWAY
+from app.services.metrics import METRICS, gauge_family
+from app.services.route_cache import ROUTE_CACHE
+from app.services.single_flight import ROUTE_PLANNING_FLIGHT
 from app.services.tool_registry import ToolRegistry
 from app.tools.definitions import TOOL_DEFINITIONS
 from app.tools.fuel_stations_runner import FuelStationsToolRunner
@@ -21,29 +48,187 @@ from app.tools.weather_runner import WeatherToolRunner
 setup_logging()
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+_DISCONNECT_POLL_SECONDS = 0.5
+
 # Global singletons for the lightweight skeleton deployment.
-tool_registry = ToolRegistry(TOOL_DEFINITIONS)
+tool_registry = ToolRegistry(TOOL_DEFINITIONS, memoize=True)
 tool_registry.register_handler("RoutePlannerTool", RoutePlannerToolRunner())
 tool_registry.register_handler("PlacesSearchTool", PlacesSearchToolRunner())
 tool_registry.register_handler("POINearRouteTool", POINearRouteToolRunner())
 tool_registry.register_handler("FuelStationsTool", FuelStationsToolRunner())
-tool_registry.register_handler("WeatherTool", WeatherToolRunner())
+weather_runner = WeatherToolRunner()
+tool_registry.register_handler("WeatherTool", weather_runner)
 tool_registry.register_handler("UserProfileTool", UserProfileToolRunner())
 tool_registry.register_handler("TripSummaryTool", TripSummaryToolRunner())
 agent_brain = AgentBrain(tool_registry=tool_registry)
+corridor_scheduler = CorridorScheduler(tool_registry)
+forecast_warmer = ForecastWarmer(weather_runner.warm_routes)
+
+
+def _cache_metrics():
+    memo = tool_registry.memo.stats() if tool_registry.memo else {}
+    llm = LLM_CACHE.stats()
+    forecasts = FORECAST_CACHE.stats()
+    flight = ROUTE_PLANNING_FLIGHT.stats()
+    yield gauge_family(
+        "tripguardian_cache_hit_ratio",
+        "Hit ratio of in-process caches.",
+        [({"cache": "tool_results"}, memo.get("hit_ratio", 0.0)), ({"cache": "llm"}, llm["hit_ratio"])],
+    )
+    yield gauge_family(
+        "tripguardian_cache_lookups",
+        "Cache lookups by outcome.",
+        [
+            ({"cache": "tool_results", "outcome": "hit"}, memo.get("hits", 0)),
+            ({"cache": "tool_results", "outcome": "miss"}, memo.get("misses", 0)),
+            ({"cache": "llm", "outcome": "hit"}, llm["hits"]),
+            ({"cache": "llm", "outcome": "miss"}, llm["misses"]),
+            ({"cache": "forecasts", "outcome": "hit"}, forecasts["hits"]),
+            ({"cache": "forecasts", "outcome": "miss"}, forecasts["misses"]),
+        ],
+    )
+    yield gauge_family(
+        "tripguardian_cache_entries",
+        "Entries currently held by in-process caches.",
+        [
+            ({"cache": "tool_results"}, memo.get("entries", 0)),
+            ({"cache": "routes"}, ROUTE_CACHE.size()),
+            ({"cache": "llm"}, llm["entries"]),
+            ({"cache": "forecasts"}, forecasts["cells"]),
+        ],
+    )
+    yield gauge_family(
+        "tripguardian_llm_cache_tokens_saved",
+        "OpenAI tokens not spent thanks to LLM cache hits.",
+        [({}, llm["tokens_saved"])],
+    )
+    yield gauge_family(
+        "tripguardian_llm_cache_latency_saved_seconds",
+        "Completion latency avoided thanks to LLM cache hits.",
+        [({}, llm["latency_saved_seconds"])],
+    )
+    yield gauge_family(
+        "tripguardian_route_planning_calls",
+        "Route computations by single-flight outcome.",
+        [({"outcome": "executed"}, flight["executed"]), ({"outcome": "coalesced"}, flight["coalesced"])],
+    )
+
+
+def _breaker_metrics():
+    snapshots = BREAKERS.snapshot()
+    yield gauge_family(
+        "tripguardian_circuit_state",
+        "Circuit breaker state per upstream (1 for the current state).",
+        [
+            ({"upstream": name, "state": state}, 1 if snapshot["state"] == state else 0)
+            for name, snapshot in snapshots.items()
+            for state in (CLOSED, HALF_OPEN, OPEN)
+        ],
+    )
+
+
+def _live_session_metrics():
+    yield gauge_family(
+        "tripguardian_live_sessions", "Live sessions currently tracked.", [({}, LIVE_SESSIONS.stats()["sessions"])]
+    )
+
+
+def _prefetch_metrics():
+    yield gauge_family(
+        "tripguardian_prefetch_pending",
+        "Live-mode prefetch tasks queued or running.",
+        [({}, agent_brain.live_agent.prefetcher.pending())],
+    )
+
+
+def _corridor_metrics():
+    yield gauge_family(
+        "tripguardian_corridor_weather_cells",
+        "Grid cells with a corridor forecast for live sessions.",
+        [({}, corridor_scheduler.stats()["cells"])],
+    )
+
+
+def _job_metrics():
+    yield gauge_family(
+        "tripguardian_jobs",
+        "Background jobs held in the job store, by status.",
+        [({"status": status}, count) for status, count in JOBS.stats().items()],
+    )
+
+
+def _llm_gateway_metrics():
+    stats = LLM_GATEWAY.stats()
+    yield gauge_family(
+        "tripguardian_llm_gateway_calls",
+        "LLM calls holding or waiting for a gateway slot.",
+        [({"state": "active"}, stats["active"]), ({"state": "waiting"}, stats["waiting"])],
+    )
+
+
+METRICS.register_collector(_cache_metrics)
+METRICS.register_collector(_breaker_metrics)
+METRICS.register_collector(_llm_gateway_metrics)
+METRICS.register_collector(_live_session_metrics)
+METRICS.register_collector(_prefetch_metrics)
+METRICS.register_collector(_corridor_metrics)
+METRICS.register_collector(_job_metrics)
 
 app = FastAPI(title=APP_CONFIG.project_name, version=APP_CONFIG.version)
 
 
+@app.on_event("startup")
+async def start_background_tasks() -> None:
+    corridor_scheduler.start()
+    if os.getenv("FORECAST_WARMING", "1") != "0":
+        forecast_warmer.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_tool_executor() -> None:
+    await corridor_scheduler.stop()
+    await forecast_warmer.stop()
+    await JOBS.stop()
+    await asyncio.to_thread(LLM_CACHE.flush)
+    tool_registry.shutdown()
+
+
+async def _cancel_on_disconnect(request: Request, work: Awaitable[T]) -> T:
+    """Await ``work`` but cancel it as soon as the HTTP client goes away."""
+
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=_DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                logger.warning("Client disconnected, cancelling agent query")
+                task.cancel()
+                raise HTTPException(status_code=499, detail="Client closed request")
+    finally:
+        if not task.done():
+            task.cancel()
+
+
 @app.post("/agent/query", response_model=QueryResponse)
-async def agent_query(payload: QueryRequest) -> QueryResponse:
+async def agent_query(payload: QueryRequest, request: Request) -> QueryResponse:
     logger.info("Received agent query (%d chars)", len(payload.query))
     try:
-        agent_result = await agent_brain.process_request(payload)
+        agent_result = await _cancel_on_disconnect(request, agent_brain.process_request(payload))
+    except HTTPException:
+        raise
     except Exception as exc:  # pragma: no cover - FastAPI will handle logging
         logger.exception("Agent processing failed")
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
+    response = _query_response(agent_result)
+    logger.info("Completed agent query using %s mode", response.context.mode)
+    return response
+
+
+def _query_response(agent_result: AgentResult) -> QueryResponse:
     context_model = AgentContext(
         mode=agent_result.context["mode"],
         scenario=agent_result.context["scenario"],
@@ -55,13 +240,136 @@ async def agent_query(payload: QueryRequest) -> QueryResponse:
             )
             for report in agent_result.context["sub_agents"]
         ],
+        llm_usage=agent_result.context.get("llm_usage"),
     )
-
-    logger.info("Completed agent query using %s mode", context_model.mode)
     return QueryResponse(text=agent_result.text, context=context_model)
 
 
+@app.post("/agent/jobs", response_model=JobStatus, status_code=202)
+async def submit_job(payload: QueryRequest) -> JobStatus:
+    """Run a query in the background; poll ``GET /agent/jobs/{job_id}`` for the result.
+
+    Submitting the same normalized trip again returns the job already queued, running
+    or finished instead of starting another one.
+    """
+
+    async def work() -> Dict[str, Any]:
+        return _query_response(await agent_brain.process_request(payload)).model_dump()
+
+    try:
+        job, created = JOBS.submit(agent_brain.request_key(payload), work)
+    except JobQueueFull as exc:
+        raise HTTPException(status_code=503, detail=f"Job queue is full: {exc}") from exc
+    logger.info("Job %s %s for %s mode", job.id, "created" if created else "reused", payload.mode)
+    return JobStatus(**job.as_dict())
+
+
+@app.get("/agent/jobs/{job_id}", response_model=JobStatus)
+async def job_status(job_id: str) -> JobStatus:
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return JobStatus(**job.as_dict())
+
+
+@app.post("/agent/calendar/batch", response_model=CalendarBatchResponse, response_model_by_alias=True)
+async def agent_calendar_batch(payload: CalendarBatchRequest, request: Request) -> CalendarBatchResponse:
+    """Triage many calendar events; full route planning only for the distinct far-away ones."""
+
+    logger.info("Received calendar batch (%d events)", len(payload.events))
+    try:
+        agent_result = await _cancel_on_disconnect(request, agent_brain.process_calendar_batch(payload))
+    except HTTPException:
+        raise
+    except Exception as exc:  # pragma: no cover - FastAPI will handle logging
+        logger.exception("Calendar batch failed")
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return CalendarBatchResponse(
+        text=agent_result.text,
+        scenario=agent_result.context["scenario"],
+        events=agent_result.context["events"],
+    )
+
+
+async def _server_sent_events(events: AsyncIterator[Tuple[str, Dict[str, Any]]]) -> AsyncIterator[str]:
+    try:
+        async for event, data in events:
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+    except Exception as exc:
+        logger.exception("Live stream failed")
+        yield f"event: error\ndata: {json.dumps({'detail': str(exc)})}\n\n"
+
+
+@app.post("/agent/live/stream")
+async def agent_live_stream(payload: QueryRequest) -> StreamingResponse:
+    """Live mode as Server-Sent Events: suggestions, tool artifacts, announcement tokens, done."""
+
+    # Starlette cancels the generator when the client disconnects.
+    return StreamingResponse(
+        _server_sent_events(agent_brain.stream_live(payload)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.websocket("/agent/live/ws")
+async def agent_live_ws(websocket: WebSocket) -> None:
+    """Live mode over a WebSocket: position updates in, versioned deltas out.
+
+    Each client message is a live ``QueryRequest`` (``mode`` is implied) and may carry
+    the ``version`` the client last applied; ``{"type": "resync"}`` or a version
+    mismatch is answered with the full snapshot instead of a delta. Unless messages
+    carry their own ``session_id``, the connection is tracked as one live session.
+    """
+
+    await websocket.accept()
+    feed = LiveFeed()
+    connection_session = f"ws-{uuid.uuid4().hex}"
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except ValueError as exc:
+                await websocket.send_json({"type": "error", "detail": f"invalid JSON: {exc}"})
+                continue
+            if not isinstance(message, dict):
+                await websocket.send_json({"type": "error", "detail": "expected a JSON object"})
+                continue
+            if message.get("type") == "resync":
+                await websocket.send_json(feed.snapshot_message())
+                continue
+            client_version = message.pop("version", None)
+            message.pop("type", None)
+            try:
+                payload = QueryRequest.model_validate(
+                    {"query": "live update", "session_id": connection_session, **message, "mode": "live"}
+                )
+            except ValidationError as exc:
+                await websocket.send_json({"type": "error", "detail": exc.errors(include_url=False)})
+                continue
+            in_sync = client_version is None or client_version == feed.version
+            try:
+                agent_result = await agent_brain.process_request(payload)
+            except Exception as exc:
+                logger.exception("Live update failed")
+                await websocket.send_json({"type": "error", "detail": str(exc)})
+                continue
+            update = feed.update(agent_result.text, agent_result.context)
+            await websocket.send_json(update if in_sync else feed.snapshot_message())
+    except WebSocketDisconnect:
+        logger.info("Live WebSocket closed at version %d", feed.version)
+    finally:
+        LIVE_SESSIONS.drop(connection_session)
+
+
 @app.get("/health")
-async def healthcheck() -> dict[str, str]:
+async def healthcheck() -> dict[str, Any]:
     logger.debug("Healthcheck pinged")
-    return {"status": "ok"}
+    breakers = BREAKERS.snapshot()
+    degraded = any(snapshot["state"] != CLOSED for snapshot in breakers.values())
+    return {"status": "degraded" if degraded else "ok", "breakers": breakers}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
@@ -21,6 +21,13 @@ class AgentConfig:
     model: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
     temperature: float = 0.3
     max_output_tokens: int = 5000
+    # Estimated input-token ceiling per agent prompt; tables are trimmed to fit.
+    prompt_token_budget: int = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "600"))
+    # Seconds an agent waits for the LLM before answering with the local heuristics.
+    planner_llm_budget_seconds: float = float(os.getenv("PLANNER_LLM_BUDGET_SECONDS", "6"))
+    live_llm_budget_seconds: float = float(os.getenv("LIVE_LLM_BUDGET_SECONDS", "2.5"))
+    # Hard cap for the request itself; a call past its budget keeps running up to this to fill the cache.
+    llm_request_timeout_seconds: float = float(os.getenv("LLM_REQUEST_TIMEOUT_SECONDS", "60"))
     organization: Optional[str] = os.getenv("OPENAI_ORG")
 
 
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+    def __init__(self, name: str, retry_in: float) -> None:
+        super().__init__(f"Circuit '{name}' is open, retry in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker driven by the error rate over a rolling time window.
+
+    The breaker opens when at least ``min_calls`` outcomes were recorded in the last
+    ``window_seconds`` and the share of failures reaches ``failure_rate_threshold``.
+    After ``open_seconds`` it lets up to ``half_open_max_calls`` probes through; one
+    success closes it again, one failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        window_seconds: float = 60.0,
+        min_calls: int = 4,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+    ) -> None:
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def acquire(self) -> None:
+        """Reserve permission for one call or raise :class:`CircuitOpenError`."""
+
+        now = time.monotonic()
+        with self._lock:
+            state = self._current_state(now)
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._half_open_in_flight < self.half_open_max_calls:
+                self._half_open_in_flight += 1
+                return
+            self.rejected += 1
+            retry_in = max(0.0, self._opened_at + self.open_seconds - now)
+        raise CircuitOpenError(self.name, retry_in)
+
+    def record_success(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._current_state(now) == HALF_OPEN:
+                logger.info("Circuit %s closed after successful probe", self.name)
+                self._reset(CLOSED)
+                return
+            self._record(now, True)
+
+    def record_failure(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            state = self._current_state(now)
+            if state == HALF_OPEN:
+                logger.warning("Circuit %s probe failed, re-opening", self.name)
+                self._trip(now)
+                return
+            if state == OPEN:
+                return
+            self._record(now, False)
+            total = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if total >= self.min_calls and failures / total >= self.failure_rate_threshold:
+                logger.warning(
+                    "Circuit %s opened (%d/%d failures in %.0fs)",
+                    self.name,
+                    failures,
+                    total,
+                    self.window_seconds,
+                )
+                self._trip(now)
+
+    def snapshot(self) -> Dict[str, object]:
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            total = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            return {
+                "state": self._current_state(now),
+                "window_calls": total,
+                "window_failures": failures,
+                "rejected": self.rejected,
+            }
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._half_open_in_flight = 0
+        return self._state
+
+    def _record(self, now: float, ok: bool) -> None:
+        self._outcomes.append((now, ok))
+        self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+
+    def _trip(self, now: float) -> None:
+        self._reset(OPEN)
+        self._opened_at = now
+
+    def _reset(self, state: str) -> None:
+        self._state = state
+        self._outcomes.clear()
+        self._half_open_in_flight = 0
+
+
+class CircuitBreakerRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    name,
+                    failure_rate_threshold=float(os.getenv("BREAKER_FAILURE_RATE", "0.5")),
+                    window_seconds=float(os.getenv("BREAKER_WINDOW_SECONDS", "60")),
+                    min_calls=int(os.getenv("BREAKER_MIN_CALLS", "4")),
+                    open_seconds=float(os.getenv("BREAKER_OPEN_SECONDS", "30")),
+                )
+                self._breakers[name] = breaker
+            return breaker
+
+    def all(self) -> List[CircuitBreaker]:
+        with self._lock:
+            return list(self._breakers.values())
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        return {breaker.name: breaker.snapshot() for breaker in self.all()}
+
+
+BREAKERS = CircuitBreakerRegistry()
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .live_sessions import LIVE_SESSIONS, LiveSession
+from .metrics import CORRIDOR_POLLS
+from .route_cache import ROUTE_CACHE
+from .tool_registry import ToolRegistry
+
+logger = logging.getLogger(__name__)
+
+CORRIDOR_POLL_SECONDS = float(os.getenv("CORRIDOR_POLL_SECONDS", "300"))
+CORRIDOR_CELL_DEG = float(os.getenv("CORRIDOR_CELL_DEG", "0.1"))
+CORRIDOR_LOOKAHEAD_KM = float(os.getenv("CORRIDOR_LOOKAHEAD_KM", "60"))
+CORRIDOR_SAMPLE_KM = 5.0
+
+Cell = Tuple[int, int]
+
+
+class CorridorScheduler:
+    """Polls weather for the road ahead of every live session, once per grid cell.
+
+    Every ``interval_seconds`` the next ``lookahead_km`` of each active session is
+    sampled and mapped to ``cell_deg`` grid cells. Sessions on the same roads share
+    cells, so each cell is fetched at most once per time slot (one poll interval)
+    no matter how many drivers pass through it, and the result is fanned out to
+    every subscribed session as ``LiveSession.weather_ahead``.
+    """
+
+    def __init__(
+        self,
+        registry: ToolRegistry,
+        interval_seconds: float = CORRIDOR_POLL_SECONDS,
+        cell_deg: float = CORRIDOR_CELL_DEG,
+        lookahead_km: float = CORRIDOR_LOOKAHEAD_KM,
+    ) -> None:
+        self.registry = registry
+        self.interval_seconds = interval_seconds
+        self.cell_deg = cell_deg
+        self.lookahead_km = lookahead_km
+        # Latest forecast per cell with the slot it was fetched in.
+        self._forecasts: Dict[Cell, Tuple[int, Dict[str, Any]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start polling on the running loop; ``interval_seconds <= 0`` disables the scheduler."""
+
+        if self.interval_seconds <= 0:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def poll(self) -> int:
+        """Refresh the cells of all live sessions for the current slot; returns cells fetched."""
+
+        slot = int(time.time() // self.interval_seconds)
+        subscriptions: Dict[str, List[Tuple[float, Cell]]] = {}
+        subscribers: Dict[Cell, Set[str]] = defaultdict(set)
+        sessions = {session.session_id: session for session in LIVE_SESSIONS.active()}
+        for session_id, session in sessions.items():
+            cells = self._cells_ahead(session)
+            subscriptions[session_id] = cells
+            for _, cell in cells:
+                subscribers[cell].add(session_id)
+
+        stale = [cell for cell in subscribers if self._forecasts.get(cell, (None,))[0] != slot]
+        for cell, entry in (await self._fetch(stale)).items():
+            self._forecasts[cell] = (slot, entry)
+        for cell in list(self._forecasts):
+            if cell not in subscribers:
+                del self._forecasts[cell]
+
+        for session_id, cells in subscriptions.items():
+            sessions[session_id].weather_ahead = [
+                {"route_km": round(km), **self._forecasts[cell][1]} for km, cell in cells if cell in self._forecasts
+            ]
+        if stale:
+            logger.info(
+                "Corridor poll: %d cells fetched for %d live sessions (%d cells subscribed)",
+                len(stale),
+                len(subscriptions),
+                len(subscribers),
+            )
+        return len(stale)
+
+    def stats(self) -> Dict[str, int]:
+        return {"cells": len(self._forecasts)}
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll()
+            except Exception as exc:  # keep polling on the next interval
+                logger.warning("Corridor poll failed: %s", exc)
+            await asyncio.sleep(self.interval_seconds)
+
+    def _cells_ahead(self, session: LiveSession) -> List[Tuple[float, Cell]]:
+        """Distinct cells on the next ``lookahead_km`` of the route, with the km they are entered at."""
+
+        entry = ROUTE_CACHE.get(session.route_id)
+        if session.position_km is None or entry is None or entry.index is None:
+            return []
+        end_km = min(entry.index.total_km, session.position_km + self.lookahead_km)
+        cells: List[Tuple[float, Cell]] = []
+        seen: Set[Cell] = set()
+        km = session.position_km
+        while km <= end_km:
+            lat, lon = entry.index.point_at(km)
+            cell = (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+            if cell not in seen:
+                seen.add(cell)
+                cells.append((km, cell))
+            km += CORRIDOR_SAMPLE_KM
+        return cells
+
+    async def _fetch(self, cells: List[Cell]) -> Dict[Cell, Dict[str, Any]]:
+        """Current weather of each cell's centre, all cells in one WeatherTool call."""
+
+        if not cells:
+            return {}
+        centers = {
+            f"{(cell[0] + 0.5) * self.cell_deg:.3f},{(cell[1] + 0.5) * self.cell_deg:.3f}": cell for cell in cells
+        }
+        # Polls want fresh data; a memoized answer could be older than the poll interval.
+        result = await self.registry.execute_async(
+            "WeatherTool",
+            {"waypoints": list(centers)},
+            rationale="Pocasie v koridore pred vodicmi.",
+            memoize=False,
+        )
+        entries = {
+            centers[entry["location"]]: dict(entry)
+            for entry in (result.output or {}).get("forecast") or []
+            if entry.get("location") in centers
+        }
+        CORRIDOR_POLLS.labels("ok").inc(len(entries))
+        CORRIDOR_POLLS.labels("empty").inc(len(cells) - len(entries))
+        return entries
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .route_cache import ROUTE_CACHE
+
+logger = logging.getLogger(__name__)
+
+# ~11 km north-south; hourly forecasts are effectively identical within a cell.
+FORECAST_CELL_DEG = float(os.getenv("FORECAST_CELL_DEG", "0.1"))
+# Route sampling step when collecting the cells of cached routes to warm.
+WARM_SAMPLE_KM = 5.0
+
+Cell = Tuple[int, int]
+
+
+def epoch_hour(when: Optional[datetime] = None) -> int:
+    """Whole UTC hours since the epoch; naive datetimes are taken as UTC."""
+
+    if when is None:
+        return int(time.time() // 3600)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return int(when.timestamp() // 3600)
+
+
+def cell_of(lat: float, lon: float, cell_deg: float = FORECAST_CELL_DEG) -> Cell:
+    return math.floor(lat / cell_deg), math.floor(lon / cell_deg)
+
+
+def cell_center(cell: Cell, cell_deg: float = FORECAST_CELL_DEG) -> Tuple[float, float]:
+    return round((cell[0] + 0.5) * cell_deg, 3), round((cell[1] + 0.5) * cell_deg, 3)
+
+
+@dataclass(frozen=True)
+class HourlyForecast:
+    """Compact hourly arrays for one cell; slot ``i`` covers UTC hour ``start_hour + i``."""
+
+    start_hour: int
+    temperature: Tuple[Optional[float], ...]
+    precip_probability: Tuple[Optional[float], ...]
+    weathercode: Tuple[Optional[int], ...]
+
+    @property
+    def end_hour(self) -> int:
+        return self.start_hour + len(self.temperature)
+
+    def at(self, when: Optional[datetime] = None) -> Optional[Tuple[Optional[float], Optional[float], Optional[int]]]:
+        """``(temperature, precip probability, weather code)`` for the hour containing ``when``."""
+
+        idx = epoch_hour(when) - self.start_hour
+        if not 0 <= idx < len(self.temperature):
+            return None
+        return self.temperature[idx], _item(self.precip_probability, idx), _item(self.weathercode, idx)
+
+    @classmethod
+    def from_open_meteo(cls, data: Dict) -> Optional["HourlyForecast"]:
+        """Build from an Open-Meteo payload requested with ``timezone=GMT``."""
+
+        hourly = data.get("hourly") or {}
+        times = hourly.get("time") or []
+        if not times:
+            return None
+        try:
+            start = datetime.fromisoformat(times[0]).replace(tzinfo=timezone.utc)
+        except ValueError:
+            return None
+        return cls(
+            start_hour=epoch_hour(start),
+            temperature=tuple(hourly.get("temperature_2m") or ()),
+            precip_probability=tuple(hourly.get("precipitation_probability") or ()),
+            weathercode=tuple(hourly.get("weathercode") or ()),
+        )
+
+
+def _item(values: Sequence, idx: int):
+    return values[idx] if idx < len(values) else None
+
+
+class ForecastCache:
+    """Hourly forecasts per grid cell, valid until the next forecast issue hour.
+
+    Entries are keyed by cell and the UTC hour they were fetched in; once the hour
+    rolls over they count as stale and the next lookup refetches. Any time inside a
+    fresh entry's horizon (typically 7 days) is answered locally.
+    """
+
+    def __init__(self, max_cells: int = 5000, cell_deg: float = FORECAST_CELL_DEG) -> None:
+        self.max_cells = max_cells
+        self.cell_deg = cell_deg
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Cell, Tuple[int, HourlyForecast]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def cell(self, lat: float, lon: float) -> Cell:
+        return cell_of(lat, lon, self.cell_deg)
+
+    def get(self, cell: Cell) -> Optional[HourlyForecast]:
+        issue_hour = epoch_hour()
+        with self._lock:
+            item = self._data.get(cell)
+            if item is None or item[0] != issue_hour:
+                self.misses += 1
+                return None
+            self._data.move_to_end(cell)
+            self.hits += 1
+            return item[1]
+
+    def put(self, cell: Cell, forecast: HourlyForecast) -> None:
+        with self._lock:
+            self._data[cell] = (epoch_hour(), forecast)
+            self._data.move_to_end(cell)
+            while len(self._data) > self.max_cells:
+                self._data.popitem(last=False)
+
+    def missing(self, cells: Sequence[Cell]) -> List[Cell]:
+        """Cells without a forecast from the current issue hour (no hit/miss accounting)."""
+
+        issue_hour = epoch_hour()
+        with self._lock:
+            return [cell for cell in dict.fromkeys(cells) if self._data.get(cell, (None,))[0] != issue_hour]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"cells": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+def route_cells(cache: ForecastCache) -> List[Cell]:
+    """Cells along every cached route, sampled every ``WARM_SAMPLE_KM``."""
+
+    cells: Dict[Cell, None] = {}
+    for entry in ROUTE_CACHE.entries():
+        index = entry.index
+        if index is None:
+            continue
+        km = 0.0
+        while km <= index.total_km:
+            cells[cache.cell(*index.point_at(km))] = None
+            km += WARM_SAMPLE_KM
+    return list(cells)
+
+
+class ForecastWarmer:
+    """Refreshes forecasts for the cells of cached routes shortly after each issue hour."""
+
+    def __init__(self, warm: Callable[[], int], delay_seconds: float = 60.0) -> None:
+        self.warm = warm
+        self.delay_seconds = delay_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                warmed = await asyncio.to_thread(self.warm)
+                if warmed:
+                    logger.info("Forecast cache warmed for %d route cells", warmed)
+            except Exception as exc:  # retry after the next issue hour
+                logger.warning("Forecast warming failed: %s", exc)
+            await asyncio.sleep(3600 - time.time() % 3600 + self.delay_seconds)
+
+
+FORECAST_CACHE = ForecastCache(max_cells=int(os.getenv("FORECAST_CACHE_MAX_CELLS", "5000")))
@@ -0,0 +1,69 @@
+"""Immutable containers for tool outputs that are shared between callers.
+
+``FrozenDict``/``FrozenList`` subclass ``dict``/``list`` so they serialize, compare
+and repr exactly like the plain payloads the agents and the API already consume,
+but every mutating method raises. Shared values (mock responses, memoized results)
+can therefore be handed out without defensive deep copies; callers that need to
+annotate a payload use :meth:`FrozenDict.overlay`, which copies only the top level.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+
+class FrozenDict(dict):
+    __slots__ = ()
+
+    def _immutable(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("tool outputs are immutable; use overlay() to derive a changed copy")
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def overlay(self, **fields: Any) -> "FrozenDict":
+        """Return a new FrozenDict with ``fields`` set, sharing every other value."""
+
+        merged = dict(self)
+        for key, value in fields.items():
+            merged[key] = freeze(value)
+        return FrozenDict(merged)
+
+    def __copy__(self) -> "FrozenDict":
+        return self
+
+    def __deepcopy__(self, memo: Any) -> "FrozenDict":
+        return self
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+class FrozenList(list):
+    __slots__ = ()
+
+    def _immutable(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("tool outputs are immutable")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+    append = extend = insert = remove = pop = clear = sort = reverse = _immutable
+
+    def __copy__(self) -> "FrozenList":
+        return self
+
+    def __deepcopy__(self, memo: Any) -> "FrozenList":
+        return self
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert dicts/lists/tuples into their frozen counterparts."""
+
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return FrozenList(freeze(item) for item in value)
+    return value
@@ -0,0 +1,114 @@
+"""Offline coordinates of common trip endpoints for cheap distance estimates.
+
+Covers Slovak district towns and the nearby capitals; anything else (or an
+explicit ``"lat,lon"``) is resolved by :func:`parse_latlon` or not at all, so a
+lookup never touches the network.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Dict, Optional
+
+from .route_geometry import LatLon, haversine_km
+from .route_index import parse_latlon
+
+# Straight-line distance times this approximates the road distance.
+ROAD_DISTANCE_FACTOR = 1.3
+
+PLACES: Dict[str, LatLon] = {
+    "bratislava": (48.1486, 17.1077),
+    "kosice": (48.7164, 21.2611),
+    "presov": (48.9984, 21.2339),
+    "zilina": (49.2231, 18.7394),
+    "banska bystrica": (48.7363, 19.1462),
+    "nitra": (48.3069, 18.0864),
+    "trnava": (48.3774, 17.5883),
+    "trencin": (48.8945, 18.0444),
+    "martin": (49.0665, 18.9219),
+    "poprad": (49.0614, 20.2980),
+    "zvolen": (48.5762, 19.1371),
+    "prievidza": (48.7745, 18.6275),
+    "michalovce": (48.7543, 21.9195),
+    "piestany": (48.5918, 17.8270),
+    "liptovsky mikulas": (49.0837, 19.6116),
+    "ruzomberok": (49.0748, 19.3004),
+    "levice": (48.2173, 18.6042),
+    "komarno": (47.7634, 18.1288),
+    "nove zamky": (47.9857, 18.1619),
+    "spisska nova ves": (48.9447, 20.5617),
+    "lucenec": (48.3306, 19.6676),
+    "rimavska sobota": (48.3826, 20.0169),
+    "humenne": (48.9371, 21.9060),
+    "bardejov": (49.2918, 21.2727),
+    "senec": (48.2196, 17.4002),
+    "malacky": (48.4361, 17.0219),
+    "dunajska streda": (47.9930, 17.6185),
+    "topolcany": (48.5590, 18.1769),
+    "cadca": (49.4380, 18.7890),
+    "dolny kubin": (49.2099, 19.2962),
+    "kezmarok": (49.1355, 20.4292),
+    "stara lubovna": (49.2986, 20.6862),
+    "roznava": (48.6610, 20.5316),
+    "vranov nad toplou": (48.8881, 21.6848),
+    "skalica": (48.8449, 17.2263),
+    "senica": (48.6794, 17.3667),
+    "hlohovec": (48.4310, 17.8031),
+    "galanta": (48.1902, 17.7270),
+    "sala": (48.1510, 17.8811),
+    "brezno": (48.8049, 19.6387),
+    "banska stiavnica": (48.4586, 18.8931),
+    "kremnica": (48.7045, 18.9184),
+    "zlate moravce": (48.3855, 18.3998),
+    "partizanske": (48.6286, 18.3744),
+    "povazska bystrica": (49.1214, 18.4210),
+    "puchov": (49.1240, 18.3265),
+    "myjava": (48.7587, 17.5685),
+    "strbske pleso": (49.1194, 20.0594),
+    "vieden": (48.2082, 16.3738),
+    "budapest": (47.4979, 19.0402),
+    "praha": (50.0755, 14.4378),
+    "brno": (49.1951, 16.6068),
+    "krakow": (50.0647, 19.9450),
+    "ostrava": (49.8209, 18.2625),
+}
+ALIASES = {
+    "wien": "vieden",
+    "vienna": "vieden",
+    "prague": "praha",
+    "krakov": "krakow",
+    "ba": "bratislava",
+    "ke": "kosice",
+    "bb": "banska bystrica",
+}
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_place(name: Optional[str]) -> str:
+    """``"Košice, Slovensko"`` -> ``"kosice"``: no diacritics, lower case, first comma part, aliases resolved."""
+
+    if not name:
+        return ""
+    if parse_latlon(name) is not None:
+        return name.strip()
+    text = unicodedata.normalize("NFKD", name.split(",")[0].lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = _SPACES.sub(" ", text.replace("-", " ")).strip()
+    return ALIASES.get(text, text)
+
+
+def lookup(name: Optional[str]) -> Optional[LatLon]:
+    coords = parse_latlon(name)
+    if coords is not None:
+        return coords
+    return PLACES.get(normalize_place(name))
+
+
+def estimate_road_km(origin: Optional[str], destination: Optional[str]) -> Optional[float]:
+    """Rough road distance between two places, or None if either is not in the gazetteer."""
+
+    start, end = lookup(origin), lookup(destination)
+    if start is None or end is None:
+        return None
+    return haversine_km(start, end) * ROAD_DISTANCE_FACTOR
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .metrics import JOBS_FINISHED
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when a submission would exceed ``max_queued`` waiting jobs."""
+
+
+@dataclass
+class Job:
+    id: str
+    key: str
+    created_at: float
+    status: str = QUEUED
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    # Submissions of the same trip that were attached to this job instead of starting another.
+    attached: int = 0
+    work: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = field(default=None, repr=False)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "attached": self.attached,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """In-memory background jobs run by a bounded pool of worker tasks.
+
+    Jobs are deduplicated by ``key``: while a job for a key is queued, running or
+    finished (and not yet expired), submitting the same key returns that job. Failed
+    jobs are not reused. Finished jobs are kept for ``result_ttl_seconds``.
+    """
+
+    def __init__(self, workers: int = 2, max_queued: int = 100, result_ttl_seconds: float = 3600.0) -> None:
+        self.workers = workers
+        self.max_queued = max_queued
+        self.result_ttl_seconds = result_ttl_seconds
+        self._jobs: Dict[str, Job] = {}
+        self._by_key: Dict[str, str] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+
+    def submit(self, key: str, work: Callable[[], Awaitable[Dict[str, Any]]]) -> Tuple[Job, bool]:
+        """Queue ``work`` under ``key``; returns ``(job, created)``."""
+
+        self._sweep(time.time())
+        existing = self._jobs.get(self._by_key.get(key, ""))
+        if existing is not None and existing.status != FAILED:
+            existing.attached += 1
+            logger.info("Job %s: attached duplicate submission (%d)", existing.id, existing.attached)
+            return existing, False
+        queue = self._ensure_workers()
+        if queue.qsize() >= self.max_queued:
+            raise JobQueueFull(f"{queue.qsize()} jobs already queued")
+        job = Job(id=uuid.uuid4().hex, key=key, created_at=time.time(), work=work)
+        self._jobs[job.id] = job
+        self._by_key[key] = job.id
+        queue.put_nowait(job)
+        logger.info("Job %s queued (%d waiting)", job.id, queue.qsize())
+        return job, True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._sweep(time.time())
+        return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return counts
+
+    async def stop(self) -> None:
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._queue = None
+
+    def _ensure_workers(self) -> asyncio.Queue:
+        # Workers live on the loop of the first submission (the app loop).
+        if self._queue is None or not self._worker_tasks or all(task.done() for task in self._worker_tasks):
+            self._queue = asyncio.Queue()
+            self._worker_tasks = [asyncio.create_task(self._worker(self._queue)) for _ in range(self.workers)]
+        return self._queue
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            job: Job = await queue.get()
+            job.status = RUNNING
+            job.started_at = time.time()
+            try:
+                job.result = await job.work()
+                job.status = DONE
+            except asyncio.CancelledError:
+                job.status, job.error = FAILED, "cancelled"
+                raise
+            except Exception as exc:
+                logger.exception("Job %s failed", job.id)
+                job.status, job.error = FAILED, str(exc)
+            finally:
+                job.finished_at = time.time()
+                job.work = None
+                JOBS_FINISHED.labels(job.status).inc()
+                queue.task_done()
+
+    def _sweep(self, now: float) -> None:
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self.result_ttl_seconds
+        ]
+        for job_id in expired:
+            job = self._jobs.pop(job_id)
+            if self._by_key.get(job.key) == job_id:
+                del self._by_key[job.key]
+
+
+JOBS = JobManager(
+    workers=int(os.getenv("JOB_WORKERS", "2")),
+    max_queued=int(os.getenv("JOB_MAX_QUEUED", "100")),
+    result_ttl_seconds=float(os.getenv("JOB_RESULT_TTL_SECONDS", "3600")),
+)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+PROGRESS_FIELDS = ("route_km", "off_route_km", "remaining_km", "remaining_minutes", "progress")
+
+
+def station_key(station: Dict[str, Any]) -> str:
+    location = station.get("location") or {}
+    return f"{station.get('name')}@{location.get('lat')},{location.get('lon')}"
+
+
+def live_snapshot(text: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of a live answer a connected client keeps in sync."""
+
+    artifacts = {report["agent"]: report.get("artifacts") or {} for report in context.get("sub_agents") or []}
+    scenario = context.get("scenario") or {}
+    return {
+        "forecast": {
+            str(entry.get("location")): dict(entry)
+            for entry in (artifacts.get("WeatherTool") or {}).get("forecast") or []
+        },
+        "stations": {
+            station_key(station): dict(station)
+            for station in (artifacts.get("FuelStationsTool") or {}).get("stations") or []
+        },
+        "recommendations": list(scenario.get("suggestions") or []),
+        "announcement": text,
+        "progress": {name: scenario[name] for name in PROGRESS_FIELDS if name in scenario},
+    }
+
+
+class LiveFeed:
+    """Per-connection live state; turns consecutive live answers into versioned deltas.
+
+    ``version`` increases with every delta that changes something. A client that
+    missed or misapplied a message asks for a resync and gets the full snapshot.
+    """
+
+    def __init__(self) -> None:
+        self.version = 0
+        self.snapshot: Optional[Dict[str, Any]] = None
+
+    def update(self, text: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply a new live answer; returns the message for the client."""
+
+        current = live_snapshot(text, context)
+        previous, self.snapshot = self.snapshot, current
+        if previous is None:
+            self.version += 1
+            return self.snapshot_message()
+        changes = _diff(previous, current)
+        if not changes:
+            return {"type": "unchanged", "version": self.version}
+        self.version += 1
+        return {"type": "delta", "version": self.version, "base_version": self.version - 1, **changes}
+
+    def snapshot_message(self) -> Dict[str, Any]:
+        snapshot = self.snapshot or live_snapshot("", {})
+        return {
+            "type": "snapshot",
+            "version": self.version,
+            "forecast": list(snapshot["forecast"].values()),
+            "stations": [{"key": key, **station} for key, station in snapshot["stations"].items()],
+            "recommendations": snapshot["recommendations"],
+            "announcement": snapshot["announcement"],
+            "progress": snapshot["progress"],
+        }
+
+
+def _diff(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    changes: Dict[str, Any] = {}
+    forecast_changed = [
+        entry for location, entry in current["forecast"].items() if previous["forecast"].get(location) != entry
+    ]
+    forecast_removed = [location for location in previous["forecast"] if location not in current["forecast"]]
+    if forecast_changed or forecast_removed:
+        changes["forecast"] = {"changed": forecast_changed, "removed": forecast_removed}
+
+    stations_added = [
+        {"key": key, **station} for key, station in current["stations"].items() if key not in previous["stations"]
+    ]
+    stations_removed = [key for key in previous["stations"] if key not in current["stations"]]
+    if stations_added or stations_removed:
+        changes["stations"] = {"added": stations_added, "removed": stations_removed}
+
+    added: List[str] = [item for item in current["recommendations"] if item not in previous["recommendations"]]
+    removed: List[str] = [item for item in previous["recommendations"] if item not in current["recommendations"]]
+    if added or removed:
+        changes["recommendations"] = {"added": added, "removed": removed}
+
+    if current["announcement"] != previous["announcement"]:
+        changes["announcement"] = current["announcement"]
+    if current["progress"] != previous["progress"]:
+        changes["progress"] = current["progress"]
+    return changes
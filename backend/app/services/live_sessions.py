@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional
+
+from route_planner.route_planer import geocode
+
+from .route_cache import ROUTE_CACHE
+from .route_index import RouteProgress, parse_latlon
+from .tool_registry import ToolExecutionResult
+
+logger = logging.getLogger(__name__)
+
+# Corridor artifacts (fuel, POI) are refetched at least this often even if items remain ahead.
+CORRIDOR_REFRESH_SECONDS = float(os.getenv("LIVE_CORRIDOR_REFRESH_SECONDS", "900"))
+# Refetch the corridor ahead once fewer than this many items are left in front of the driver.
+MIN_ITEMS_AHEAD = 2
+# Speed samples above this are treated as position noise.
+MAX_PLAUSIBLE_SPEED_KMH = 200.0
+
+
+@dataclass
+class LiveSession:
+    """Server-side state of one driver on an active route.
+
+    ``session_id`` identifies the trip or client; ``route_id`` is the cached route
+    it follows, which several sessions may share.
+    """
+
+    session_id: str
+    route_id: str
+    created_at: float
+    updated_at: float
+    updates: int = 0
+    location: Optional[str] = None
+    destination: Optional[str] = None
+    progress: Optional[RouteProgress] = None
+    moved_at: Optional[float] = None
+    speed_kmh: Optional[float] = None
+    artifacts: Dict[str, ToolExecutionResult] = field(default_factory=dict)
+    # Forecasts for the road ahead, filled in by the corridor scheduler.
+    weather_ahead: List[Dict[str, Any]] = field(default_factory=list)
+    refreshed_at: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def position_km(self) -> Optional[float]:
+        return self.progress.route_km if self.progress is not None else None
+
+    def move_to(self, progress: RouteProgress) -> None:
+        """Record a new snapped position and update the smoothed speed along the route."""
+
+        now = time.time()
+        if self.progress is not None and self.moved_at is not None and now > self.moved_at:
+            sample = (progress.route_km - self.progress.route_km) / ((now - self.moved_at) / 3600)
+            if 0 <= sample <= MAX_PLAUSIBLE_SPEED_KMH:
+                self.speed_kmh = sample if self.speed_kmh is None else 0.5 * self.speed_kmh + 0.5 * sample
+        self.progress = progress
+        self.moved_at = now
+
+    def remember(self, result: ToolExecutionResult) -> None:
+        if (result.output or {}).get("error"):
+            return
+        self.artifacts[result.name] = result
+        self.refreshed_at[result.name] = time.time()
+
+    def reuse(self, name: str, key: str, rationale: str) -> Optional[ToolExecutionResult]:
+        """Previous ``name`` result without the items behind the driver, or None if it must be refetched."""
+
+        result = self.artifacts.get(name)
+        if result is None or time.time() - self.refreshed_at.get(name, 0.0) > CORRIDOR_REFRESH_SECONDS:
+            return None
+        items = (result.output or {}).get(key) or []
+        if self.position_km is None:
+            return replace(result, rationale=rationale)
+        ahead = [item for item in items if item.get("route_km") is None or item["route_km"] >= self.position_km]
+        if len(ahead) < min(MIN_ITEMS_AHEAD, len(items)):
+            return None
+        output = result.output if len(ahead) == len(items) else {**result.output, key: ahead}
+        return replace(result, rationale=rationale, output=output)
+
+
+class LiveSessionStore:
+    """Live sessions keyed by session id; idle sessions expire after ``ttl_seconds``."""
+
+    def __init__(self, ttl_seconds: float = 1800.0, max_sessions: int = 10000) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, LiveSession] = {}
+        self._expiry_listeners: List[Callable[[str], None]] = []
+
+    def on_expire(self, listener: Callable[[str], None]) -> None:
+        """Call ``listener(session_id)`` whenever a session expires, is dropped or switches route."""
+
+        self._expiry_listeners.append(listener)
+
+    def touch(self, session_id: str, route_id: str) -> LiveSession:
+        """Return the session ``session_id`` on ``route_id`` (creating it if needed) and count one update.
+
+        A session that switches to another route starts over, since its position and
+        artifacts belong to the old route.
+        """
+
+        now = time.time()
+        with self._lock:
+            expired = self._sweep(now)
+            session = self._sessions.get(session_id)
+            if session is not None and session.route_id != route_id:
+                del self._sessions[session_id]
+                expired.append(session_id)
+                session = None
+            if session is None:
+                if len(self._sessions) >= self.max_sessions:
+                    oldest = min(self._sessions.values(), key=lambda item: item.updated_at)
+                    del self._sessions[oldest.session_id]
+                    expired.append(oldest.session_id)
+                session = LiveSession(session_id=session_id, route_id=route_id, created_at=now, updated_at=now)
+                self._sessions[session_id] = session
+                logger.info("Live session %s opened on route %s", session_id, route_id)
+            session.updated_at = now
+            session.updates += 1
+        self._notify(expired)
+        return session
+
+    def get(self, session_id: str) -> Optional[LiveSession]:
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def is_live(self, session: LiveSession) -> bool:
+        """True while ``session`` is still tracked under its id and not idle."""
+
+        with self._lock:
+            current = self._sessions.get(session.session_id)
+        return current is session and time.time() - session.updated_at <= self.ttl_seconds
+
+    def active(self) -> List[LiveSession]:
+        with self._lock:
+            expired = self._sweep(time.time())
+            sessions = list(self._sessions.values())
+        self._notify(expired)
+        return sessions
+
+    def drop(self, session_id: str) -> None:
+        with self._lock:
+            removed = self._sessions.pop(session_id, None)
+        if removed is not None:
+            self._notify([session_id])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"sessions": len(self._sessions)}
+
+    def _sweep(self, now: float) -> List[str]:
+        expired = [key for key, session in self._sessions.items() if now - session.updated_at > self.ttl_seconds]
+        for key in expired:
+            del self._sessions[key]
+        if expired:
+            logger.info("Expired %d idle live sessions", len(expired))
+        return expired
+
+    def _notify(self, session_ids: List[str]) -> None:
+        for session_id in session_ids:
+            for listener in self._expiry_listeners:
+                listener(session_id)
+
+
+def locate_on_route(route_id: str, location: Optional[str]) -> Optional[RouteProgress]:
+    """Snap ``location`` ("lat,lon" or a place name) onto the cached route.
+
+    Coordinates are snapped directly through the route's spatial index; place names
+    need a geocode first, which may block on Nominatim.
+    """
+
+    entry = ROUTE_CACHE.get(route_id)
+    if not location or entry is None or entry.index is None:
+        return None
+    coords = parse_latlon(location)
+    if coords is None:
+        try:
+            lon, lat = geocode(location)
+        except Exception as exc:  # pragma: no cover - network
+            logger.warning("Cannot place %s on route %s: %s", location, route_id, exc)
+            return None
+        coords = (lat, lon)
+    return entry.index.progress(*coords)
+
+
+LIVE_SESSIONS = LiveSessionStore(
+    ttl_seconds=float(os.getenv("LIVE_SESSION_TTL_SECONDS", "1800")),
+    max_sessions=int(os.getenv("LIVE_SESSION_MAX", "10000")),
+)
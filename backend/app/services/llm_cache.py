@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .tool_result_cache import canonical_arguments
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedCompletion:
+    text: str
+    total_tokens: int
+    latency_seconds: float
+    expires_at: float
+
+
+class LLMResponseCache:
+    """TTL + LRU cache of LLM answers keyed by a hash of model settings and prompt inputs.
+
+    Keys are built from the structured inputs a prompt is rendered from (not the
+    rendered text), so cosmetic prompt changes or dict ordering do not split entries.
+    With ``persist_path`` set, entries survive restarts via a small JSON file that a
+    background timer rewrites at most once per ``flush_delay_seconds`` after changes.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 600.0,
+        max_entries: int = 256,
+        persist_path: Optional[Path] = None,
+        flush_delay_seconds: float = 5.0,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self.flush_delay_seconds = flush_delay_seconds
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        self._data: "OrderedDict[str, CachedCompletion]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+        self.latency_saved_seconds = 0.0
+        if persist_path:
+            self._load()
+
+    def key_for(self, model: str, temperature: float, kind: str, inputs: Dict[str, Any]) -> str:
+        material = canonical_arguments({"model": model, "temperature": temperature, "kind": kind, "inputs": inputs})
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry.expires_at <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            self.tokens_saved += entry.total_tokens
+            self.latency_saved_seconds += entry.latency_seconds
+            return entry.text
+
+    def put(self, key: str, text: str, total_tokens: int = 0, latency_seconds: float = 0.0) -> None:
+        if not text:
+            return
+        entry = CachedCompletion(
+            text=text,
+            total_tokens=total_tokens,
+            latency_seconds=latency_seconds,
+            expires_at=time.time() + self.ttl_seconds,
+        )
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            if self.persist_path and self._flush_timer is None:
+                # put() runs on the event loop; the file is written later on the timer thread.
+                self._flush_timer = threading.Timer(self.flush_delay_seconds, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self) -> None:
+        """Write pending changes to ``persist_path`` now; also called on shutdown."""
+
+        with self._lock:
+            timer, self._flush_timer = self._flush_timer, None
+            if timer is None:
+                return
+            timer.cancel()
+            snapshot = dict(self._data)
+        self._save(snapshot)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "tokens_saved": self.tokens_saved,
+                "latency_saved_seconds": round(self.latency_saved_seconds, 3),
+            }
+
+    def _load(self) -> None:
+        if not self.persist_path.exists():
+            return
+        try:
+            with self.persist_path.open("r", encoding="utf-8") as handle:
+                raw = json.load(handle)
+        except (OSError, json.JSONDecodeError) as exc:
+            logger.warning("Ignoring unreadable LLM cache file %s: %s", self.persist_path, exc)
+            return
+        if not isinstance(raw, dict):
+            logger.warning("Ignoring LLM cache file %s: not a JSON object", self.persist_path)
+            return
+        now = time.time()
+        skipped = 0
+        for key, item in raw.items():
+            try:
+                entry = CachedCompletion(**item)
+                expired = entry.expires_at <= now
+            except (TypeError, ValueError):
+                skipped += 1
+                continue
+            if not expired:
+                self._data[key] = entry
+        if skipped:
+            logger.warning("Skipped %d malformed entries in LLM cache file %s", skipped, self.persist_path)
+        logger.info("Loaded %d cached LLM responses from %s", len(self._data), self.persist_path)
+
+    def _save(self, snapshot: Dict[str, CachedCompletion]) -> None:
+        tmp_path = self.persist_path.with_suffix(".tmp")
+        with self._save_lock:
+            try:
+                self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+                with tmp_path.open("w", encoding="utf-8") as handle:
+                    json.dump({key: asdict(entry) for key, entry in snapshot.items()}, handle, ensure_ascii=False)
+                os.replace(tmp_path, self.persist_path)
+            except OSError as exc:
+                logger.warning("Failed to persist LLM cache: %s", exc)
+
+
+_persist = os.getenv("LLM_CACHE_PATH")
+LLM_CACHE = LLMResponseCache(
+    ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", "600")),
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256")),
+    persist_path=Path(_persist) if _persist else None,
+)
@@ -3,7 +3,7 @@ from __future__ import annotations
 import logging
 from functools import lru_cache
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 from app.config import AGENT_CONFIG
 
@@ -16,3 +16,11 @@ def get_openai_client() -> OpenAI:
 
     logger.info("Initializing OpenAI client for model %s", AGENT_CONFIG.model)
     return OpenAI(organization=AGENT_CONFIG.organization)
+
+
+@lru_cache(maxsize=1)
+def get_async_openai_client() -> AsyncOpenAI:
+    """Singleton async client so agent LLM calls can overlap with tool execution."""
+
+    logger.info("Initializing async OpenAI client for model %s", AGENT_CONFIG.model)
+    return AsyncOpenAI(organization=AGENT_CONFIG.organization)
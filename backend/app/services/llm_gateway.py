@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Protocol, Tuple
+
+from .llm_client import get_async_openai_client
+from .metrics import LLM_QUEUE_TIME, LLM_REQUESTS, LLM_TOKENS
+from .upstream import upstream_call
+
+logger = logging.getLogger(__name__)
+
+# Lower value = served first when the pool is saturated.
+PRIORITY_LIVE = 0
+PRIORITY_CALENDAR = 1
+PRIORITY_PLANNER = 2
+PRIORITY_NAMES = {PRIORITY_LIVE: "live", PRIORITY_CALENDAR: "calendar", PRIORITY_PLANNER: "planner"}
+
+
+@dataclass
+class LLMRequest:
+    kind: str
+    messages: List[Dict[str, str]]
+    model: str
+    temperature: float
+    max_completion_tokens: int
+    timeout_seconds: Optional[float] = None
+
+
+@dataclass
+class LLMResponse:
+    text: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    queue_seconds: float = 0.0
+    latency_seconds: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+class LLMBackend(Protocol):
+    name: str
+
+    async def complete(self, request: LLMRequest) -> LLMResponse: ...
+
+    def stream(self, request: LLMRequest, response: LLMResponse) -> AsyncIterator[str]:
+        """Yield text deltas, filling ``response`` (text and token usage) as they arrive."""
+        ...
+
+
+class OpenAIBackend:
+    name = "openai"
+
+    async def complete(self, request: LLMRequest) -> LLMResponse:
+        client = get_async_openai_client()
+        with upstream_call("openai"):
+            completion = await client.chat.completions.create(
+                model=request.model,
+                messages=request.messages,
+                temperature=request.temperature,
+                max_completion_tokens=request.max_completion_tokens,
+                timeout=request.timeout_seconds,
+            )
+        usage = getattr(completion, "usage", None)
+        return LLMResponse(
+            text=(completion.choices[0].message.content or "").strip(),
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        )
+
+    async def stream(self, request: LLMRequest, response: LLMResponse) -> AsyncIterator[str]:
+        client = get_async_openai_client()
+        with upstream_call("openai"):
+            chunks = await client.chat.completions.create(
+                model=request.model,
+                messages=request.messages,
+                temperature=request.temperature,
+                max_completion_tokens=request.max_completion_tokens,
+                timeout=request.timeout_seconds,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            async for chunk in chunks:
+                if chunk.usage is not None:
+                    response.prompt_tokens = chunk.usage.prompt_tokens or 0
+                    response.completion_tokens = chunk.usage.completion_tokens or 0
+                if chunk.choices and chunk.choices[0].delta.content:
+                    delta = chunk.choices[0].delta.content
+                    response.text += delta
+                    yield delta
+
+
+class StubBackend:
+    """Offline backend for tests and local runs: echoes the prompt's first line after a fixed delay."""
+
+    name = "stub"
+
+    def __init__(self, delay_seconds: float = 0.0) -> None:
+        self.delay_seconds = delay_seconds
+        self.calls = 0
+
+    async def complete(self, request: LLMRequest) -> LLMResponse:
+        self.calls += 1
+        if self.delay_seconds:
+            await asyncio.sleep(self.delay_seconds)
+        prompt = request.messages[-1]["content"] if request.messages else ""
+        text = f"[stub {request.kind}] {prompt.splitlines()[0] if prompt else ''}".strip()
+        return LLMResponse(
+            text=text,
+            prompt_tokens=sum(len(message.get("content", "")) for message in request.messages) // 4,
+            completion_tokens=len(text) // 4,
+        )
+
+    async def stream(self, request: LLMRequest, response: LLMResponse) -> AsyncIterator[str]:
+        complete = await self.complete(request)
+        response.prompt_tokens = complete.prompt_tokens
+        response.completion_tokens = complete.completion_tokens
+        for word in complete.text.split(" "):
+            delta = word if not response.text else " " + word
+            response.text += delta
+            yield delta
+
+
+@dataclass
+class TokenLedger:
+    """Token usage of every LLM call made while handling one request."""
+
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    by_kind: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, kind: str, response: LLMResponse) -> None:
+        self.calls += 1
+        self.prompt_tokens += response.prompt_tokens
+        self.completion_tokens += response.completion_tokens
+        self.by_kind[kind] = self.by_kind.get(kind, 0) + response.total_tokens
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "by_kind": dict(self.by_kind),
+        }
+
+
+_LEDGER: ContextVar[Optional[TokenLedger]] = ContextVar("llm_token_ledger", default=None)
+
+
+@contextmanager
+def track_tokens() -> Iterator[TokenLedger]:
+    """Collect token usage of LLM calls made in this context (tasks spawned inside inherit it)."""
+
+    ledger = TokenLedger()
+    token = _LEDGER.set(ledger)
+    try:
+        yield ledger
+    finally:
+        _LEDGER.reset(token)
+
+
+class _PrioritySlots:
+    """Loop-local semaphore that wakes waiters by priority, FIFO within a priority."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    def waiting(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    async def acquire(self, priority: int) -> None:
+        if self.active < self.limit and not self.waiting():
+            self.active += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before the cancellation landed.
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # Hand the slot straight to the next waiter; ``active`` stays unchanged.
+                future.set_result(None)
+                return
+        self.active -= 1
+
+
+class LLMGateway:
+    """Single entry point for agent LLM calls.
+
+    Bounds in-flight completions to ``max_concurrency`` and, when saturated, admits
+    live-mode calls before calendar and planner ones. Every call is accounted in the
+    token metrics and in the :func:`track_tokens` ledger of the current request.
+    """
+
+    def __init__(self, backend: LLMBackend, max_concurrency: int = 4) -> None:
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _PrioritySlots]" = weakref.WeakKeyDictionary()
+
+    async def complete(self, request: LLMRequest, priority: int = PRIORITY_PLANNER) -> LLMResponse:
+        slots = self._slots_for_loop()
+        label = PRIORITY_NAMES.get(priority, str(priority))
+        queued = time.perf_counter()
+        await slots.acquire(priority)
+        started = time.perf_counter()
+        LLM_QUEUE_TIME.labels(label).observe(started - queued)
+        try:
+            response = await self.backend.complete(request)
+        except Exception:
+            LLM_REQUESTS.labels(request.kind, "error").inc()
+            raise
+        finally:
+            slots.release()
+        response.queue_seconds = started - queued
+        response.latency_seconds = time.perf_counter() - started
+        self._account(request.kind, response)
+        return response
+
+    def _account(self, kind: str, response: LLMResponse) -> None:
+        LLM_REQUESTS.labels(kind, "ok").inc()
+        LLM_TOKENS.labels(kind, "prompt").inc(response.prompt_tokens)
+        LLM_TOKENS.labels(kind, "completion").inc(response.completion_tokens)
+        ledger = _LEDGER.get()
+        if ledger is not None:
+            ledger.record(kind, response)
+
+    async def stream(
+        self,
+        request: LLMRequest,
+        priority: int = PRIORITY_PLANNER,
+        response: Optional[LLMResponse] = None,
+    ) -> AsyncIterator[str]:
+        """Stream text deltas; the slot is held until the stream ends or is closed.
+
+        Pass ``response`` to read the accumulated text and token usage afterwards.
+        """
+
+        response = response if response is not None else LLMResponse(text="")
+        slots = self._slots_for_loop()
+        queued = time.perf_counter()
+        await slots.acquire(priority)
+        started = time.perf_counter()
+        response.queue_seconds = started - queued
+        LLM_QUEUE_TIME.labels(PRIORITY_NAMES.get(priority, str(priority))).observe(response.queue_seconds)
+        try:
+            async for delta in self.backend.stream(request, response):
+                yield delta
+        except Exception:
+            LLM_REQUESTS.labels(request.kind, "error").inc()
+            raise
+        finally:
+            slots.release()
+            response.latency_seconds = time.perf_counter() - started
+        response.text = response.text.strip()
+        self._account(request.kind, response)
+
+    def stats(self) -> Dict[str, int]:
+        active = waiting = 0
+        for slots in list(self._slots.values()):
+            active += slots.active
+            waiting += slots.waiting()
+        return {"max_concurrency": self.max_concurrency, "active": active, "waiting": waiting}
+
+    def _slots_for_loop(self) -> _PrioritySlots:
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = _PrioritySlots(self.max_concurrency)
+            self._slots[loop] = slots
+        return slots
+
+
+def _build_backend(name: str) -> LLMBackend:
+    if name == "stub":
+        return StubBackend(delay_seconds=float(os.getenv("LLM_STUB_DELAY_SECONDS", "0")))
+    if name != "openai":
+        logger.warning("Unknown LLM_BACKEND '%s', using openai", name)
+    return OpenAIBackend()
+
+
+LLM_GATEWAY = LLMGateway(
+    backend=_build_backend(os.getenv("LLM_BACKEND", "openai").lower()),
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "4")),
+)
@@ -0,0 +1,294 @@
+"""In-process metrics with Prometheus text exposition.
+
+Hot-path writes are lock-free: every thread increments its own value cells and
+only the scrape sums them up. The registry lock is taken when a new label set or
+thread shard is created, never on a plain ``inc``/``observe``.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+Sample = Tuple[str, Dict[str, str], float]
+Collector = Callable[[], Iterable["MetricFamily"]]
+
+
+class _ShardedCells:
+    """Per-thread lists of floats; each cell list is only ever written by its owner thread."""
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._cells: List[List[float]] = []
+
+    def cell(self) -> List[float]:
+        cell = getattr(self._local, "cell", None)
+        if cell is None:
+            cell = [0.0] * self._size
+            self._local.cell = cell
+            with self._lock:
+                self._cells.append(cell)
+        return cell
+
+    def totals(self) -> List[float]:
+        with self._lock:
+            cells = list(self._cells)
+        totals = [0.0] * self._size
+        for cell in cells:
+            for idx, value in enumerate(cell):
+                totals[idx] += value
+        return totals
+
+
+class MetricFamily:
+    def __init__(self, name: str, kind: str, help_text: str, samples: Sequence[Sample]) -> None:
+        self.name = name
+        self.kind = kind
+        self.help_text = help_text
+        self.samples = samples
+
+
+class _CounterChild:
+    def __init__(self) -> None:
+        self._cells = _ShardedCells(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._cells.cell()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._cells.totals()[0]
+
+
+class _HistogramChild:
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self._buckets = buckets
+        # One slot per bucket, one for +Inf, then sum.
+        self._cells = _ShardedCells(len(buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        cell = self._cells.cell()
+        cell[bisect_left(self._buckets, value)] += 1
+        cell[-1] += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        totals = self._cells.totals()
+        counts = totals[:-1]
+        cumulative: List[float] = []
+        running = 0.0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return cumulative, running, totals[-1]
+
+
+class _LabeledMetric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):  # pragma: no cover - overridden
+        raise NotImplementedError
+
+    def _label_dict(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def collect(self) -> MetricFamily:  # pragma: no cover - overridden
+        raise NotImplementedError
+
+
+class Counter(_LabeledMetric):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def collect(self) -> MetricFamily:
+        samples = [
+            (f"{self.name}_total", self._label_dict(key), child.value)
+            for key, child in list(self._children.items())
+        ]
+        return MetricFamily(self.name, self.kind, self.help_text, samples)
+
+
+class Histogram(_LabeledMetric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def collect(self) -> MetricFamily:
+        samples: List[Sample] = []
+        for key, child in list(self._children.items()):
+            labels = self._label_dict(key)
+            cumulative, count, total = child.snapshot()
+            for bound, value in zip(self.buckets, cumulative):
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, value))
+            samples.append((f"{self.name}_bucket", {**labels, "le": "+Inf"}, count))
+            samples.append((f"{self.name}_count", labels, count))
+            samples.append((f"{self.name}_sum", labels, total))
+        return MetricFamily(self.name, self.kind, self.help_text, samples)
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _LabeledMetric] = {}
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def register_collector(self, collector: Collector) -> None:
+        """Add a callback producing gauge-style families at scrape time."""
+
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        families: List[MetricFamily] = [metric.collect() for metric in metrics]
+        for collector in collectors:
+            families.extend(collector())
+        lines: List[str] = []
+        for family in families:
+            lines.append(f"# HELP {family.name} {family.help_text}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for sample_name, labels, value in family.samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+
+def gauge_family(name: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> MetricFamily:
+    return MetricFamily(name, "gauge", help_text, [(name, labels, value) for labels, value in samples])
+
+
+def _format_labels(labels: Optional[Dict[str, str]]) -> str:
+    if not labels:
+        return ""
+    rendered = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return "{" + rendered + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+METRICS = MetricsRegistry()
+
+TOOL_LATENCY = METRICS.histogram(
+    "tripguardian_tool_duration_seconds", "Tool handler execution time.", ["tool"]
+)
+TOOL_ERRORS = METRICS.counter("tripguardian_tool_errors", "Tool handler exceptions.", ["tool"])
+TOOL_FALLBACKS = METRICS.counter(
+    "tripguardian_tool_fallbacks", "Tool calls answered from mock_response.", ["tool", "reason"]
+)
+UPSTREAM_LATENCY = METRICS.histogram(
+    "tripguardian_upstream_request_duration_seconds", "Outbound HTTP call latency.", ["upstream"]
+)
+UPSTREAM_ERRORS = METRICS.counter(
+    "tripguardian_upstream_errors", "Failed outbound HTTP calls.", ["upstream"]
+)
+UPSTREAM_SHORT_CIRCUITS = METRICS.counter(
+    "tripguardian_upstream_short_circuits", "Outbound calls rejected by an open circuit breaker.", ["upstream"]
+)
+AGENT_LATENCY = METRICS.histogram(
+    "tripguardian_agent_run_duration_seconds", "End-to-end agent run time.", ["mode"]
+)
+AGENT_ERRORS = METRICS.counter("tripguardian_agent_errors", "Agent runs that raised.", ["mode"])
+PROMPT_TOKENS = METRICS.histogram(
+    "tripguardian_llm_prompt_tokens",
+    "Estimated input tokens per LLM prompt.",
+    ["kind"],
+    buckets=(50, 100, 200, 400, 800, 1600, 3200, 6400),
+)
+PROMPT_TRUNCATIONS = METRICS.counter(
+    "tripguardian_llm_prompt_truncations", "Prompts trimmed to fit their token budget.", ["kind"]
+)
+LLM_FALLBACKS = METRICS.counter(
+    "tripguardian_llm_fallbacks", "Agent LLM calls answered by local heuristics.", ["kind", "reason"]
+)
+LLM_QUEUE_TIME = METRICS.histogram(
+    "tripguardian_llm_queue_seconds", "Time LLM calls wait for a gateway slot.", ["priority"]
+)
+LLM_REQUESTS = METRICS.counter("tripguardian_llm_requests", "LLM calls made through the gateway.", ["kind", "outcome"])
+LLM_TOKENS = METRICS.counter("tripguardian_llm_tokens", "Tokens consumed by LLM calls.", ["kind", "type"])
+PREFETCH_TASKS = METRICS.counter(
+    "tripguardian_prefetch_tasks", "Live-mode prefetch tasks by outcome.", ["tool", "outcome"]
+)
+CORRIDOR_POLLS = METRICS.counter(
+    "tripguardian_corridor_weather_polls", "Per-cell weather polls of the corridor scheduler.", ["outcome"]
+)
+JOBS_FINISHED = METRICS.counter("tripguardian_jobs_finished", "Background jobs finished, by status.", ["status"])
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .tool_registry import ToolExecutionResult, ToolPlan, ToolRegistry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PlanTiming:
+    name: str
+    started: float
+    finished: float
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
+
+
+class PlanExecutor:
+    """Runs ToolPlans as a dependency graph, executing independent tools concurrently.
+
+    A plan starts as soon as every tool named in its ``depends_on`` has finished.
+    Results are returned in the original plan order so downstream consumers such as
+    ``ResponseComposer`` see the same sequence as with sequential execution. Tools run
+    through ``ToolRegistry.execute_async``, so the registry's executor, timeouts and
+    per-tool concurrency limits apply.
+    """
+
+    def __init__(self, registry: ToolRegistry):
+        self.registry = registry
+
+    async def execute(
+        self,
+        plans: Sequence[ToolPlan],
+        on_result: Optional[Callable[[ToolExecutionResult], None]] = None,
+    ) -> List[ToolExecutionResult]:
+        """Execute ``plans``; ``on_result`` is called as each tool finishes, in completion order."""
+
+        dependencies = self._resolve_dependencies(plans)
+        results: Dict[int, ToolExecutionResult] = {}
+        timings: Dict[int, PlanTiming] = {}
+        pending = set(range(len(plans)))
+        running: Dict[asyncio.Task, int] = {}
+        request_started = time.perf_counter()
+
+        try:
+            while pending or running:
+                ready = [idx for idx in sorted(pending) if dependencies[idx] <= results.keys()]
+                for idx in ready:
+                    pending.discard(idx)
+                    running[asyncio.create_task(self._run_plan(plans[idx]))] = idx
+                if not running:
+                    raise RuntimeError("Tool plan dependencies could not be satisfied")
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    idx = running.pop(task)
+                    results[idx], timings[idx] = task.result()
+                    if on_result is not None:
+                        on_result(results[idx])
+        finally:
+            for task in running:
+                task.cancel()
+
+        self._log_critical_path(plans, dependencies, timings, request_started)
+        return [results[idx] for idx in range(len(plans))]
+
+    async def _run_plan(self, plan: ToolPlan) -> tuple[ToolExecutionResult, PlanTiming]:
+        started = time.perf_counter()
+        result = await self.registry.execute_async(plan.name, plan.arguments, rationale=plan.rationale)
+        return result, PlanTiming(name=plan.name, started=started, finished=time.perf_counter())
+
+    def _resolve_dependencies(self, plans: Sequence[ToolPlan]) -> List[set[int]]:
+        positions: Dict[str, int] = {}
+        for idx, plan in enumerate(plans):
+            positions.setdefault(plan.name, idx)
+        dependencies: List[set[int]] = []
+        for idx, plan in enumerate(plans):
+            resolved = set()
+            for name in plan.depends_on:
+                dep_idx = positions.get(name)
+                if dep_idx is None:
+                    logger.warning("Plan %s depends on %s which is not scheduled, ignoring", plan.name, name)
+                    continue
+                if dep_idx == idx:
+                    raise ValueError(f"Tool plan {plan.name} cannot depend on itself")
+                resolved.add(dep_idx)
+            dependencies.append(resolved)
+        self._ensure_acyclic(plans, dependencies)
+        return dependencies
+
+    def _ensure_acyclic(self, plans: Sequence[ToolPlan], dependencies: List[set[int]]) -> None:
+        visiting: set[int] = set()
+        visited: set[int] = set()
+
+        def visit(idx: int) -> None:
+            if idx in visited:
+                return
+            if idx in visiting:
+                raise ValueError(f"Tool plan dependency cycle detected at {plans[idx].name}")
+            visiting.add(idx)
+            for dep in dependencies[idx]:
+                visit(dep)
+            visiting.discard(idx)
+            visited.add(idx)
+
+        for idx in range(len(plans)):
+            visit(idx)
+
+    def _log_critical_path(
+        self,
+        plans: Sequence[ToolPlan],
+        dependencies: List[set[int]],
+        timings: Dict[int, PlanTiming],
+        request_started: float,
+    ) -> None:
+        if not timings:
+            return
+        # Walk back from the last plan to finish through whichever dependency released it.
+        current: Optional[int] = max(timings, key=lambda idx: timings[idx].finished)
+        path: List[PlanTiming] = []
+        while current is not None:
+            path.append(timings[current])
+            deps = dependencies[current]
+            current = max(deps, key=lambda idx: timings[idx].finished) if deps else None
+        path.reverse()
+        total = max(timing.finished for timing in timings.values()) - request_started
+        serial = sum(timing.duration for timing in timings.values())
+        logger.info(
+            "Plan critical path: %s (wall %.2fs, serial tool time %.2fs)",
+            " -> ".join(f"{timing.name} {timing.duration:.2f}s" for timing in path),
+            total,
+            serial,
+        )
@@ -57,6 +57,7 @@ class SimpleToolPlanner:
                     "route_id": f"{origin or 'KE'}-{destination or 'BA'}",
                     "max_detour_km": 20,
                 },
+                depends_on=["RoutePlannerTool"],
             )
         )
 
@@ -84,6 +85,7 @@ class SimpleToolPlanner:
                 name="FuelStationsTool",
                 rationale="Doplnam moznosti tankovania/ nabijania v strede trasy.",
                 arguments={"route_id": f"{origin or 'KE'}-{destination or 'BA'}", "energy_type": "petrol"},
+                depends_on=["RoutePlannerTool"],
             )
         )
 
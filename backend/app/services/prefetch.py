@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import os
+import time
+import weakref
+from typing import Any, Callable, Dict, Tuple
+
+from .live_sessions import LIVE_SESSIONS, LiveSession
+from .metrics import PREFETCH_TASKS
+from .route_cache import ROUTE_CACHE
+from .tool_registry import ToolRegistry
+
+logger = logging.getLogger(__name__)
+
+# Live positions are rounded down to this grid so requests and prefetches share memo keys.
+PREFETCH_STEP_KM = int(os.getenv("PREFETCH_STEP_KM", "5"))
+# How far ahead (in driving time) to warm the caches, and a hard cap in km.
+PREFETCH_LOOKAHEAD_MINUTES = float(os.getenv("PREFETCH_LOOKAHEAD_MINUTES", "20"))
+PREFETCH_MAX_KM = float(os.getenv("PREFETCH_MAX_KM", "40"))
+# Global prefetch budget across all sessions: running tasks and queued tasks.
+PREFETCH_MAX_CONCURRENCY = int(os.getenv("PREFETCH_MAX_CONCURRENCY", "4"))
+PREFETCH_MAX_PENDING = int(os.getenv("PREFETCH_MAX_PENDING", "64"))
+# Used until a session has two positions to measure speed from.
+DEFAULT_SPEED_KMH = 80.0
+
+# ``plan(session, km)`` -> {tool name: arguments} the live agent would send at ``km``.
+PrefetchPlan = Callable[[LiveSession, int], Dict[str, Dict[str, Any]]]
+
+
+def quantize_km(km: float) -> int:
+    return int(km // PREFETCH_STEP_KM) * PREFETCH_STEP_KM
+
+
+class RoutePrefetcher:
+    """Warms the tool memo for the stretch a live session is about to drive.
+
+    After each live update the next ``PREFETCH_STEP_KM`` steps that the driver
+    reaches within ``PREFETCH_LOOKAHEAD_MINUTES`` (at the session's measured speed)
+    are fetched in the background with exactly the arguments the agent will send
+    there, so the following updates are answered from the memo. At most
+    ``max_concurrency`` prefetches run and ``max_pending`` are queued across all
+    sessions; a session's prefetches are cancelled once it expires or the driver
+    passes them. A step whose result was memoized is not prefetched again until
+    that memo entry has expired; failed or fallback prefetches are retried on the
+    next update.
+    """
+
+    def __init__(
+        self,
+        registry: ToolRegistry,
+        plan: PrefetchPlan,
+        max_concurrency: int = PREFETCH_MAX_CONCURRENCY,
+        max_pending: int = PREFETCH_MAX_PENDING,
+    ) -> None:
+        self.registry = registry
+        self.plan = plan
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self._tasks: Dict[str, Dict[Tuple[str, int], asyncio.Task]] = {}
+        # Finished steps per route, with the monotonic time their memo entries expire.
+        self._done: Dict[str, Dict[Tuple[str, int], float]] = {}
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        LIVE_SESSIONS.on_expire(self.cancel)
+
+    def schedule(self, session: LiveSession) -> int:
+        """Queue prefetches ahead of ``session``'s position; returns how many were started."""
+
+        entry = ROUTE_CACHE.get(session.route_id)
+        if session.position_km is None or entry is None or entry.index is None:
+            return 0
+        speed = session.speed_kmh or entry.index.average_speed_kmh or DEFAULT_SPEED_KMH
+        horizon_km = min(PREFETCH_MAX_KM, speed * PREFETCH_LOOKAHEAD_MINUTES / 60)
+        start = quantize_km(session.position_km)
+        self._forget_behind(session.session_id, start)
+
+        tasks = self._tasks.setdefault(session.session_id, {})
+        done = self._done.setdefault(session.session_id, {})
+        now = time.monotonic()
+        started = 0
+        for step in range(1, max(1, math.ceil(horizon_km / PREFETCH_STEP_KM)) + 1):
+            km = start + step * PREFETCH_STEP_KM
+            if km >= entry.index.total_km:
+                break
+            for name, arguments in self.plan(session, km).items():
+                key = (name, km)
+                if done.get(key, 0.0) > now or key in tasks:
+                    continue
+                if self.pending() >= self.max_pending:
+                    PREFETCH_TASKS.labels(name, "skipped").inc()
+                    return started
+                task = asyncio.create_task(self._prefetch(session, name, arguments))
+                tasks[key] = task
+                task.add_done_callback(
+                    lambda task, session_id=session.session_id, key=key: self._finish(session_id, key, task)
+                )
+                started += 1
+        return started
+
+    def cancel(self, session_id: str) -> None:
+        """Drop all prefetch work of live session ``session_id`` (it went stale)."""
+
+        tasks = self._tasks.pop(session_id, {})
+        self._done.pop(session_id, None)
+        for task in tasks.values():
+            task.cancel()
+        if tasks:
+            logger.info("Cancelled %d prefetches of stale live session %s", len(tasks), session_id)
+
+    def pending(self) -> int:
+        return sum(len(tasks) for tasks in self._tasks.values())
+
+    def stats(self) -> Dict[str, int]:
+        return {"pending": self.pending(), "sessions": len(self._tasks)}
+
+    async def _prefetch(self, session: LiveSession, name: str, arguments: Dict[str, Any]) -> bool:
+        """Run one prefetch; True only if its result landed in the memo."""
+
+        try:
+            async with self._semaphore_for_loop():
+                if not LIVE_SESSIONS.is_live(session):
+                    PREFETCH_TASKS.labels(name, "cancelled").inc()
+                    return False
+                result = await self.registry.execute_async(name, arguments, rationale="Prefetch")
+        except asyncio.CancelledError:
+            PREFETCH_TASKS.labels(name, "cancelled").inc()
+            raise
+        except Exception as exc:
+            PREFETCH_TASKS.labels(name, "error").inc()
+            logger.warning("Prefetch %s for session %s failed: %s", name, session.session_id, exc)
+            return False
+        if not self.registry.memoizable(name, result.output or {}):
+            PREFETCH_TASKS.labels(name, "fallback").inc()
+            return False
+        PREFETCH_TASKS.labels(name, "done").inc()
+        return True
+
+    def _finish(self, session_id: str, key: Tuple[str, int], task: asyncio.Task) -> None:
+        tasks = self._tasks.get(session_id)
+        if tasks is None or tasks.pop(key, None) is None:
+            return
+        # Failed, cancelled or fallback prefetches leave no marker, so the next update retries them.
+        if not task.cancelled() and task.exception() is None and task.result():
+            ttl = self.registry.get(key[0]).cache_ttl_seconds or 0
+            self._done.setdefault(session_id, {})[key] = time.monotonic() + ttl
+        if not tasks:
+            del self._tasks[session_id]
+
+    def _forget_behind(self, session_id: str, km: int) -> None:
+        for key, task in list(self._tasks.get(session_id, {}).items()):
+            if key[1] < km:
+                task.cancel()
+        done = self._done.get(session_id)
+        if done:
+            now = time.monotonic()
+            for key in [key for key, expires_at in done.items() if key[1] < km or expires_at <= now]:
+                del done[key]
+
+    def _semaphore_for_loop(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
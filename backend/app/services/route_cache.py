@@ -3,7 +3,11 @@ from __future__ import annotations
 import threading
 import unicodedata
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple
+
+from .route_geometry import cumulative_km
+from .route_index import RouteIndex
 
 
 @dataclass
@@ -15,6 +19,35 @@ class RouteCacheEntry:
     payload: Dict[str, Any]
     raw: Dict[str, Any]
 
+    @cached_property
+    def geometry(self) -> List[Tuple[float, float]]:
+        """``(lat, lon)`` polyline of the fastest planned variant."""
+
+        routes = self.raw.get("routes") or []
+        if not routes:
+            return []
+        fastest = min(routes, key=lambda route: route.get("duration_min") or float("inf"))
+        return [tuple(point) for point in fastest.get("geometry") or []]
+
+    @cached_property
+    def cumulative_km(self) -> List[float]:
+        return cumulative_km(self.geometry)
+
+    @cached_property
+    def index(self) -> Optional[RouteIndex]:
+        """Spatial index of the fastest variant, built once per cached route."""
+
+        if len(self.geometry) < 2:
+            return None
+        return RouteIndex(self.geometry, self.cumulative_km, self.payload.get("estimated_duration_minutes"))
+
+    def route_km(self, lat: float, lon: float) -> Optional[float]:
+        """Distance along the route to the point closest to ``(lat, lon)``."""
+
+        if self.index is None:
+            return None
+        return self.index.snap(lat, lon)[0]
+
 
 class RouteCache:
     def __init__(self) -> None:
@@ -29,7 +62,7 @@ class RouteCache:
         raw: Dict[str, Any],
         alias: Optional[str] = None,
     ) -> None:
-        key = self._build_key(origin, destination)
+        key = self.key_for(origin, destination)
         entry = RouteCacheEntry(origin=origin, destination=destination, payload=payload, raw=raw)
         with self._lock:
             self._data[key] = entry
@@ -48,11 +81,26 @@ class RouteCache:
         if "-" in identifier or ">" in identifier:
             parts = [p for p in self._split(identifier) if p]
             if len(parts) >= 2:
-                key = self._build_key(parts[0], parts[-1])
+                key = self.key_for(parts[0], parts[-1])
                 with self._lock:
                     return self._data.get(key)
         return None
 
+    def entries(self) -> List[RouteCacheEntry]:
+        """Distinct cached routes (an entry stored under aliases is listed once)."""
+
+        with self._lock:
+            return list({id(entry): entry for entry in self._data.values()}.values())
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def key_for(self, origin: str, destination: str) -> str:
+        """Normalized key shared by every consumer of the same origin/destination pair."""
+
+        return f"{self._normalize(origin)}__{self._normalize(destination)}"
+
     def _split(self, identifier: str) -> list[str]:
         separators = "->|/\\"
         temp = identifier
@@ -65,8 +113,5 @@ class RouteCache:
         ascii_only = "".join(ch for ch in normalized if not unicodedata.combining(ch))
         return "".join(ch for ch in ascii_only.lower() if ch.isalnum())
 
-    def _build_key(self, origin: str, destination: str) -> str:
-        return f"{self._normalize(origin)}__{self._normalize(destination)}"
-
 
 ROUTE_CACHE = RouteCache()
@@ -0,0 +1,65 @@
+"""Distance helpers for route geometries given as ``(lat, lon)`` polylines."""
+from __future__ import annotations
+
+import math
+from typing import List, Sequence, Tuple
+
+LatLon = Tuple[float, float]
+
+KM_PER_DEG_LAT = 110.574
+KM_PER_DEG_LON_EQUATOR = 111.320
+EARTH_RADIUS_KM = 6371.0
+
+
+def distance_km(a: LatLon, b: LatLon) -> float:
+    """Equirectangular distance; accurate to well under 1 % at route-segment scale."""
+
+    mean_lat = math.radians((a[0] + b[0]) / 2)
+    dy = (b[0] - a[0]) * KM_PER_DEG_LAT
+    dx = (b[1] - a[1]) * KM_PER_DEG_LON_EQUATOR * math.cos(mean_lat)
+    return math.hypot(dx, dy)
+
+
+def haversine_km(a: LatLon, b: LatLon) -> float:
+    """Great-circle distance; use for point-to-point estimates beyond segment scale."""
+
+    lat1, lat2 = math.radians(a[0]), math.radians(b[0])
+    dlat, dlon = lat2 - lat1, math.radians(b[1] - a[1])
+    h = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+def cumulative_km(geometry: Sequence[LatLon]) -> List[float]:
+    """Distance from the route start to every vertex."""
+
+    totals = [0.0] * len(geometry)
+    for idx in range(1, len(geometry)):
+        totals[idx] = totals[idx - 1] + distance_km(geometry[idx - 1], geometry[idx])
+    return totals
+
+
+def project_onto_segment(point: LatLon, start: LatLon, end: LatLon) -> Tuple[float, float]:
+    """Return ``(fraction along the segment, distance in km)`` of the closest point to ``point``."""
+
+    scale = KM_PER_DEG_LON_EQUATOR * math.cos(math.radians(point[0]))
+    ax, ay = start[1] * scale, start[0] * KM_PER_DEG_LAT
+    bx, by = end[1] * scale, end[0] * KM_PER_DEG_LAT
+    px, py = point[1] * scale, point[0] * KM_PER_DEG_LAT
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    fraction = 0.0 if length_sq == 0 else max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length_sq))
+    return fraction, math.hypot(ax + fraction * dx - px, ay + fraction * dy - py)
+
+
+def locate_km(geometry: Sequence[LatLon], cumulative: Sequence[float], point: LatLon) -> Tuple[float, float]:
+    """Return ``(km along the route, km off the route)`` of ``point`` by scanning every segment."""
+
+    if len(geometry) < 2:
+        return 0.0, distance_km(geometry[0], point) if geometry else 0.0
+    best_km, best_offset = 0.0, float("inf")
+    for idx in range(len(geometry) - 1):
+        fraction, offset = project_onto_segment(point, geometry[idx], geometry[idx + 1])
+        if offset < best_offset:
+            best_offset = offset
+            best_km = cumulative[idx] + fraction * (cumulative[idx + 1] - cumulative[idx])
+    return best_km, best_offset
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import math
+import re
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .route_geometry import KM_PER_DEG_LAT, KM_PER_DEG_LON_EQUATOR, LatLon, locate_km
+
+# Grid search radius; positions farther off the route fall back to the exact linear scan,
+# which is cheaper than walking every ring of a long route's grid.
+SNAP_RADIUS_KM = 5.0
+
+_LATLON_RE = re.compile(r"^\s*(-?\d{1,2}(?:\.\d+)?)\s*,\s*(-?\d{1,3}(?:\.\d+)?)\s*$")
+
+
+def parse_latlon(text: Optional[str]) -> Optional[LatLon]:
+    """Parse ``"48.72,21.26"`` into ``(lat, lon)``; anything else (e.g. a place name) gives None."""
+
+    if not text:
+        return None
+    match = _LATLON_RE.match(text)
+    if not match:
+        return None
+    lat, lon = float(match.group(1)), float(match.group(2))
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+@dataclass(frozen=True)
+class RouteProgress:
+    route_km: float
+    off_route_km: float
+    remaining_km: float
+    remaining_minutes: Optional[float]
+    progress: float
+
+    def as_dict(self) -> Dict[str, Optional[float]]:
+        return {
+            "route_km": round(self.route_km, 1),
+            "off_route_km": round(self.off_route_km, 2),
+            "remaining_km": round(self.remaining_km, 1),
+            "remaining_minutes": round(self.remaining_minutes) if self.remaining_minutes is not None else None,
+            "progress": round(self.progress, 3),
+        }
+
+
+class RouteIndex:
+    """Uniform-grid index over the segments of one route polyline.
+
+    Coordinates are projected once onto a local planar grid (km) around the route,
+    and every segment is registered in the cells its bounding box touches. Snapping
+    a position then only projects onto the few segments in nearby cells, so it
+    stays in the microsecond range regardless of route length. Positions more than
+    ``SNAP_RADIUS_KM`` off the route use the exact linear scan instead.
+    """
+
+    def __init__(
+        self,
+        geometry: Sequence[LatLon],
+        cumulative_km: Sequence[float],
+        total_minutes: Optional[float] = None,
+        cell_km: float = 0.5,
+    ) -> None:
+        self.geometry = list(geometry)
+        self.cumulative_km = list(cumulative_km)
+        self.total_km = self.cumulative_km[-1] if self.cumulative_km else 0.0
+        self.total_minutes = total_minutes
+        self.cell_km = cell_km
+        mean_lat = sum(lat for lat, _ in self.geometry) / len(self.geometry) if self.geometry else 0.0
+        self._kx = KM_PER_DEG_LON_EQUATOR * math.cos(math.radians(mean_lat))
+        self._points = [self._project(lat, lon) for lat, lon in self.geometry]
+        # Per segment: start point, direction vector and squared length.
+        self._segments: List[Tuple[float, float, float, float, float]] = []
+        self._cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for idx in range(len(self._points) - 1):
+            (ax, ay), (bx, by) = self._points[idx], self._points[idx + 1]
+            dx, dy = bx - ax, by - ay
+            self._segments.append((ax, ay, dx, dy, dx * dx + dy * dy))
+            for cx in range(self._cell(min(ax, bx)), self._cell(max(ax, bx)) + 1):
+                for cy in range(self._cell(min(ay, by)), self._cell(max(ay, by)) + 1):
+                    self._cells[(cx, cy)].append(idx)
+        self._max_ring = min(self._rings_to_cover(), math.ceil(SNAP_RADIUS_KM / cell_km))
+
+    def snap(self, lat: float, lon: float) -> Tuple[float, float]:
+        """Return ``(km along the route, km off the route)`` for a position."""
+
+        if len(self._points) < 2:
+            return locate_km(self.geometry, self.cumulative_km, (lat, lon))
+        px, py = self._project(lat, lon)
+        cx, cy = self._cell(px), self._cell(py)
+        best_offset = float("inf")
+        best_km = 0.0
+        seen = set()
+        for ring in range(self._max_ring + 1):
+            for key in self._ring(cx, cy, ring):
+                for idx in self._cells.get(key, ()):
+                    if idx in seen:
+                        continue
+                    seen.add(idx)
+                    fraction, offset = self._project_onto(idx, px, py)
+                    if offset < best_offset:
+                        best_offset = offset
+                        best_km = self.cumulative_km[idx] + fraction * (
+                            self.cumulative_km[idx + 1] - self.cumulative_km[idx]
+                        )
+            # Segments not yet seen lie outside the searched block of cells.
+            margin = min(
+                px - (cx - ring) * self.cell_km,
+                (cx + ring + 1) * self.cell_km - px,
+                py - (cy - ring) * self.cell_km,
+                (cy + ring + 1) * self.cell_km - py,
+            )
+            if best_offset <= margin:
+                return best_km, best_offset
+        # Farther than SNAP_RADIUS_KM off the route: exact scan.
+        return locate_km(self.geometry, self.cumulative_km, (lat, lon))
+
+    def progress(self, lat: float, lon: float) -> RouteProgress:
+        route_km, offset = self.snap(lat, lon)
+        remaining_km = max(0.0, self.total_km - route_km)
+        fraction = route_km / self.total_km if self.total_km else 0.0
+        remaining_minutes = self.total_minutes * (1 - fraction) if self.total_minutes is not None else None
+        return RouteProgress(
+            route_km=route_km,
+            off_route_km=offset,
+            remaining_km=remaining_km,
+            remaining_minutes=remaining_minutes,
+            progress=fraction,
+        )
+
+    def point_at(self, km: float) -> LatLon:
+        """Position ``km`` along the route, interpolated between vertices."""
+
+        km = max(0.0, min(km, self.total_km))
+        idx = min(max(bisect_right(self.cumulative_km, km) - 1, 0), len(self.geometry) - 2)
+        start, end = self.cumulative_km[idx], self.cumulative_km[idx + 1]
+        fraction = (km - start) / (end - start) if end > start else 0.0
+        (alat, alon), (blat, blon) = self.geometry[idx], self.geometry[idx + 1]
+        return alat + fraction * (blat - alat), alon + fraction * (blon - alon)
+
+    @property
+    def average_speed_kmh(self) -> Optional[float]:
+        if not self.total_minutes or not self.total_km:
+            return None
+        return self.total_km / (self.total_minutes / 60)
+
+    def minutes_between(self, from_km: float, to_km: float) -> Optional[float]:
+        """Driving time between two route positions, pro rata of the route's total duration."""
+
+        speed = self.average_speed_kmh
+        if speed is None:
+            return None
+        return max(0.0, to_km - from_km) / speed * 60
+
+    def _project(self, lat: float, lon: float) -> Tuple[float, float]:
+        return lon * self._kx, lat * KM_PER_DEG_LAT
+
+    def _cell(self, value: float) -> int:
+        return math.floor(value / self.cell_km)
+
+    def _project_onto(self, idx: int, px: float, py: float) -> Tuple[float, float]:
+        ax, ay, dx, dy, length_sq = self._segments[idx]
+        fraction = 0.0 if length_sq == 0 else max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length_sq))
+        return fraction, math.hypot(ax + fraction * dx - px, ay + fraction * dy - py)
+
+    @staticmethod
+    def _ring(cx: int, cy: int, ring: int):
+        if ring == 0:
+            yield cx, cy
+            return
+        for dx in range(-ring, ring + 1):
+            yield cx + dx, cy - ring
+            yield cx + dx, cy + ring
+        for dy in range(-ring + 1, ring):
+            yield cx - ring, cy + dy
+            yield cx + ring, cy + dy
+
+    def _rings_to_cover(self) -> int:
+        if not self._cells:
+            return 0
+        xs = [key[0] for key in self._cells]
+        ys = [key[1] for key in self._cells]
+        return max(max(xs) - min(xs), max(ys) - min(ys)) + 1
@@ -1,14 +1,23 @@
 from __future__ import annotations
 
+import asyncio
+import inspect
 import json
-from dataclasses import dataclass
-from typing import Any, Callable, Dict, Iterable, List, Sequence
+import os
+import time
+import weakref
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
 
 import logging
-from copy import deepcopy
 
 from app.tools.base import ToolDefinition
 
+from .frozen import freeze
+from .metrics import TOOL_ERRORS, TOOL_FALLBACKS, TOOL_LATENCY
+from .tool_result_cache import ToolResultCache
+
 
 class ToolNotRegisteredError(ValueError):
     """Raised when the agent requests an unknown tool."""
@@ -16,16 +25,25 @@ class ToolNotRegisteredError(ValueError):
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_EXECUTOR_WORKERS = int(os.getenv("TOOL_EXECUTOR_WORKERS", "16"))
+
 
 @dataclass
 class ToolPlan:
     name: str
     rationale: str
     arguments: Dict[str, Any]
+    depends_on: List[str] = field(default_factory=list)
 
 
 @dataclass
 class ToolExecutionResult:
+    """Outcome of one tool call.
+
+    Memoized results and mock fallbacks are read-only FrozenDicts shared between
+    callers; fresh handler outputs are returned as produced.
+    """
+
     name: str
     rationale: str
     arguments: Dict[str, Any]
@@ -35,9 +53,26 @@ class ToolExecutionResult:
 class ToolRegistry:
     """Stores tool metadata and executes mock invocations."""
 
-    def __init__(self, definitions: Sequence[ToolDefinition]):
+    def __init__(
+        self,
+        definitions: Sequence[ToolDefinition],
+        max_workers: Optional[int] = None,
+        memoize: bool = False,
+        memo_max_entries: int = 512,
+    ):
         self._definitions: Dict[str, ToolDefinition] = {tool.name: tool for tool in definitions}
         self._handlers: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {}
+        # Opt-in result memoization; only tools with cache_ttl_seconds participate.
+        self.memo: Optional[ToolResultCache] = ToolResultCache(memo_max_entries) if memoize else None
+        # Sync handlers invoked from execute_async run here instead of on the event loop.
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or DEFAULT_EXECUTOR_WORKERS,
+            thread_name_prefix="tool-exec",
+        )
+        # asyncio primitives are bound to a loop, so semaphores are kept per loop.
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+            weakref.WeakKeyDictionary()
+        )
         logger.info("Registered %d tools", len(self._definitions))
 
     def list_openai_tools(self) -> List[Dict[str, Any]]:
@@ -67,9 +102,13 @@ class ToolRegistry:
         )
         handler = self._handlers.get(name)
         if handler:
-            output = self._invoke_handler(handler, parsed_args, tool)
+            memo_key = self._memo_key(tool, parsed_args)
+            output = self._memo_lookup(memo_key)
+            if output is None:
+                output = self._memo_store(tool, memo_key, self._invoke_handler(handler, parsed_args, tool))
         else:
-            output = deepcopy(tool.mock_response)
+            TOOL_FALLBACKS.labels(name, "no_handler").inc()
+            output = tool.mock_response
         return ToolExecutionResult(
             name=name,
             rationale=rationale,
@@ -77,6 +116,93 @@ class ToolRegistry:
             output=output,
         )
 
+    async def execute_async(
+        self,
+        name: str,
+        arguments: Any,
+        rationale: str = "",
+        executor: Optional[Executor] = None,
+        memoize: bool = True,
+    ) -> ToolExecutionResult:
+        """Awaitable variant of :meth:`execute` that never blocks the event loop.
+
+        Sync handlers run on the registry executor (or ``executor`` when given),
+        native ``async`` handlers are awaited directly. ``ToolDefinition.timeout_seconds``
+        and ``ToolDefinition.max_concurrency`` are enforced per tool; a timeout falls
+        back to the tool's ``mock_response``. Cancelling the awaiting task (e.g. when
+        the HTTP client disconnects) cancels queued work; a sync handler that already
+        started keeps its thread until it returns, but its result is discarded.
+        ``memoize=False`` neither reads nor writes the memo, for callers that poll for
+        fresh data.
+        """
+
+        tool = self.get(name)
+        parsed_args = self._normalize_arguments(arguments)
+        logger.info(
+            "Agent async call -> %s (args: %s)",
+            name,
+            ",".join(sorted(parsed_args.keys())) or "<no-args>",
+        )
+        handler = self._handlers.get(name)
+        if handler:
+            memo_key = self._memo_key(tool, parsed_args) if memoize else None
+            output = self._memo_lookup(memo_key)
+            if output is None:
+                semaphore = self._semaphore_for(tool)
+                if semaphore:
+                    async with semaphore:
+                        output = await self._invoke_handler_async(handler, parsed_args, tool, executor)
+                else:
+                    output = await self._invoke_handler_async(handler, parsed_args, tool, executor)
+                output = self._memo_store(tool, memo_key, output)
+        else:
+            TOOL_FALLBACKS.labels(name, "no_handler").inc()
+            output = tool.mock_response
+        return ToolExecutionResult(
+            name=name,
+            rationale=rationale,
+            arguments=parsed_args,
+            output=output,
+        )
+
+    def memoizable(self, name: str, output: Dict[str, Any]) -> bool:
+        """Whether ``output`` of ``name`` is a real answer that the memo keeps.
+
+        Fallbacks (errors, timeouts, shared mock payloads, degraded upstream answers)
+        are never memoized, so the next call retries once the upstream recovers.
+        """
+
+        tool = self.get(name)
+        return output is not tool.mock_response and "error" not in output and not output.get("degraded")
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _memo_key(self, tool: ToolDefinition, arguments: Dict[str, Any]) -> Optional[str]:
+        if self.memo is None or not tool.idempotent or not tool.cache_ttl_seconds:
+            return None
+        return self.memo.key_for(tool.name, arguments)
+
+    def _memo_lookup(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        if key is None:
+            return None
+        cached = self.memo.get(key)
+        if cached is not None:
+            logger.debug("Memoized result reused for %s", key)
+        return cached
+
+    def _memo_store(self, tool: ToolDefinition, key: Optional[str], output: Dict[str, Any]) -> Dict[str, Any]:
+        """Memoize ``output`` if eligible; returns what the caller should hand out.
+
+        Only memoized outputs are frozen (once, here), since only they are shared.
+        """
+
+        if key is None or not self.memoizable(tool.name, output):
+            return output
+        output = freeze(output)
+        self.memo.put(key, output, tool.cache_ttl_seconds)
+        return output
+
     def _normalize_arguments(self, arguments: Any) -> Dict[str, Any]:
         if isinstance(arguments, str) and arguments.strip():
             logger.debug("Parsing JSON arguments for tool call")
@@ -91,13 +217,63 @@ class ToolRegistry:
         arguments: Dict[str, Any],
         tool: ToolDefinition,
     ) -> Dict[str, Any]:
+        started = time.perf_counter()
         try:
             return handler(arguments)
         except Exception as exc:  # pragma: no cover - network/IO delegates
             logger.exception("Custom handler for %s failed", tool.name)
-            fallback = deepcopy(tool.mock_response)
-            fallback["error"] = str(exc)
-            return fallback
+            return self._error_fallback(tool, str(exc), reason="error")
+        finally:
+            TOOL_LATENCY.labels(tool.name).observe(time.perf_counter() - started)
+
+    async def _invoke_handler_async(
+        self,
+        handler: Callable[[Dict[str, Any]], Any],
+        arguments: Dict[str, Any],
+        tool: ToolDefinition,
+        executor: Optional[Executor],
+    ) -> Dict[str, Any]:
+        started = time.perf_counter()
+        if _is_async_handler(handler):
+            awaitable = handler(arguments)
+        else:
+            loop = asyncio.get_running_loop()
+            awaitable = loop.run_in_executor(executor or self._executor, handler, arguments)
+        try:
+            if tool.timeout_seconds:
+                return await asyncio.wait_for(awaitable, timeout=tool.timeout_seconds)
+            return await awaitable
+        except asyncio.TimeoutError:
+            logger.warning("Handler for %s timed out after %ss", tool.name, tool.timeout_seconds)
+            return self._error_fallback(tool, f"{tool.name} timed out after {tool.timeout_seconds}s", reason="timeout")
+        except Exception as exc:  # pragma: no cover - network/IO delegates
+            logger.exception("Custom handler for %s failed", tool.name)
+            return self._error_fallback(tool, str(exc), reason="error")
+        finally:
+            TOOL_LATENCY.labels(tool.name).observe(time.perf_counter() - started)
+
+    def _error_fallback(self, tool: ToolDefinition, message: str, reason: str) -> Dict[str, Any]:
+        if reason == "error":
+            TOOL_ERRORS.labels(tool.name).inc()
+        TOOL_FALLBACKS.labels(tool.name, reason).inc()
+        return tool.mock_response.overlay(error=message)
+
+    def _semaphore_for(self, tool: ToolDefinition) -> Optional[asyncio.Semaphore]:
+        if not tool.max_concurrency:
+            return None
+        loop = asyncio.get_running_loop()
+        per_loop = self._semaphores.setdefault(loop, {})
+        semaphore = per_loop.get(tool.name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(tool.max_concurrency)
+            per_loop[tool.name] = semaphore
+        return semaphore
 
     def names(self) -> Iterable[str]:
         return self._definitions.keys()
+
+
+def _is_async_handler(handler: Callable[..., Any]) -> bool:
+    return inspect.iscoroutinefunction(handler) or inspect.iscoroutinefunction(
+        getattr(handler, "__call__", None)
+    )
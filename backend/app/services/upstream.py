@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from .circuit_breaker import BREAKERS, OPEN, CircuitOpenError
+from .metrics import UPSTREAM_ERRORS, UPSTREAM_LATENCY, UPSTREAM_SHORT_CIRCUITS
+
+
+class UpstreamCall:
+    """Handle yielded by :func:`upstream_call` for reporting non-exception failures."""
+
+    def __init__(self, upstream: str) -> None:
+        self.upstream = upstream
+        self.failed = False
+
+    def mark_failure(self) -> None:
+        """Flag a failed response that did not raise."""
+
+        self.failed = True
+
+    def record_status(self, status_code: int) -> None:
+        """Treat throttling and server errors as upstream failures."""
+
+        if status_code == 429 or status_code >= 500:
+            self.failed = True
+
+
+def is_available(upstream: str) -> bool:
+    """Cheap pre-check so runners can skip a whole batch of calls while a breaker is open."""
+
+    return BREAKERS.get(upstream).state != OPEN
+
+
+@contextmanager
+def upstream_call(upstream: str) -> Iterator[UpstreamCall]:
+    """Guard one outbound HTTP call with the upstream's circuit breaker and record its outcome.
+
+    Raises :class:`~app.services.circuit_breaker.CircuitOpenError` without calling
+    the upstream while its breaker is open, so callers drop straight to their
+    cached or mock fallback instead of waiting for a timeout.
+    """
+
+    breaker = BREAKERS.get(upstream)
+    try:
+        breaker.acquire()
+    except CircuitOpenError:
+        UPSTREAM_SHORT_CIRCUITS.labels(upstream).inc()
+        raise
+    call = UpstreamCall(upstream)
+    started = time.perf_counter()
+    try:
+        yield call
+    except Exception:
+        call.failed = True
+        raise
+    finally:
+        UPSTREAM_LATENCY.labels(upstream).observe(time.perf_counter() - started)
+        if call.failed:
+            UPSTREAM_ERRORS.labels(upstream).inc()
+            breaker.record_failure()
+        else:
+            breaker.record_success()
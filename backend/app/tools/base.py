@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+from app.services.frozen import freeze
 
 
 @dataclass(frozen=True)
@@ -12,6 +14,14 @@ class ToolDefinition:
     description: str
     input_schema: Dict[str, Any]
     mock_response: Dict[str, Any]
+    timeout_seconds: Optional[float] = None
+    max_concurrency: Optional[int] = None
+    cache_ttl_seconds: Optional[float] = None
+    idempotent: bool = True
+
+    def __post_init__(self) -> None:
+        # Mock payloads double as shared fallbacks, so hand them out read-only.
+        object.__setattr__(self, "mock_response", freeze(self.mock_response))
 
     def to_openai_tool(self) -> Dict[str, Any]:
         """Serialize the tool into the format expected by OpenAI tool-calling."""
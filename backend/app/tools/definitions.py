@@ -23,6 +23,9 @@ ROUTE_PLANNER = ToolDefinition(
         "required": ["origin", "destination"],
     },
     mock_response={"distance_km": None, "estimated_duration_minutes": None, "legs": []},
+    timeout_seconds=300,
+    max_concurrency=2,
+    cache_ttl_seconds=1800,
 )
 
 PLACES_SEARCH = ToolDefinition(
@@ -41,6 +44,9 @@ PLACES_SEARCH = ToolDefinition(
         "required": ["location"],
     },
     mock_response={"places": []},
+    timeout_seconds=45,
+    max_concurrency=4,
+    cache_ttl_seconds=3600,
 )
 
 POI_NEAR_ROUTE = ToolDefinition(
@@ -57,10 +63,17 @@ POI_NEAR_ROUTE = ToolDefinition(
                 "type": "number",
                 "description": "How far from the main corridor the user is willing to go.",
             },
+            "ahead_of_km": {
+                "type": "number",
+                "description": "Only return places past this distance along the route (live tracking).",
+            },
         },
         "required": ["route_id"],
     },
     mock_response={"suggestions": []},
+    timeout_seconds=300,
+    max_concurrency=4,
+    cache_ttl_seconds=900,
 )
 
 FUEL_STATIONS = ToolDefinition(
@@ -75,27 +88,51 @@ FUEL_STATIONS = ToolDefinition(
                 "enum": ["petrol", "diesel", "ev"],
                 "description": "Preferred fueling energy type.",
             },
+            "ahead_of_km": {
+                "type": "number",
+                "description": "Only return stations past this distance along the route (live tracking).",
+            },
         },
         "required": ["route_id", "energy_type"],
     },
     mock_response={"stations": []},
+    timeout_seconds=300,
+    max_concurrency=4,
+    cache_ttl_seconds=900,
 )
 
 WEATHER = ToolDefinition(
     name="WeatherTool",
-    description="Provides forecast for the next 6 hours along specified waypoints.",
+    description=(
+        "Provides forecast along specified waypoints, or along a cached route at the hour "
+        "the driver reaches each sampled point."
+    ),
     input_schema={
         "type": "object",
         "properties": {
             "waypoints": {
                 "type": "array",
                 "items": {"type": "string"},
-                "description": "Ordered list of city names or coordinates to check.",
-            }
+                "description": "Ordered list of city names or \"lat,lon\" coordinates to check.",
+            },
+            "route_id": {
+                "type": "string",
+                "description": "Sample this cached route instead of waypoints; returns one entry per sample with ETA.",
+            },
+            "sample_every_km": {
+                "type": "number",
+                "description": "Distance between route samples (default 20 km).",
+            },
+            "ahead_of_km": {
+                "type": "number",
+                "description": "Start sampling at this distance along the route (driver position in live tracking).",
+            },
         },
-        "required": ["waypoints"],
     },
     mock_response={"forecast": []},
+    timeout_seconds=30,
+    max_concurrency=8,
+    cache_ttl_seconds=600,
 )
 
 USER_PROFILE = ToolDefinition(
@@ -109,6 +146,9 @@ USER_PROFILE = ToolDefinition(
         "required": ["user_id"],
     },
     mock_response={"preferences": {}},
+    timeout_seconds=5,
+    max_concurrency=16,
+    cache_ttl_seconds=60,
 )
 
 TRIP_SUMMARY = ToolDefinition(
@@ -127,6 +167,10 @@ TRIP_SUMMARY = ToolDefinition(
         "required": ["stops"],
     },
     mock_response={"summary": ""},
+    timeout_seconds=5,
+    max_concurrency=4,
+    # Persists a new trip log on every call, so results must never be reused.
+    idempotent=False,
 )
 
 
@@ -6,6 +6,7 @@ from typing import Any, Dict, List, Optional, Tuple
 import requests
 
 from app.services.route_cache import ROUTE_CACHE, RouteCacheEntry
+from app.services.upstream import is_available, upstream_call
 from app.tools.definitions import FUEL_STATIONS
 from app.tools.route_planner_runner import RoutePlannerToolRunner
 from route_planner.route_planer import haversine
@@ -34,17 +35,28 @@ class FuelStationsToolRunner:
         if not entry:
             logger.warning("FuelStationsToolRunner missing cache for %s", route_id)
             return FUEL_STATIONS.mock_response
-        stations = self._search(entry, energy)
+        stations = self._search(entry, energy, arguments.get("ahead_of_km"))
+        if stations is None:
+            return FUEL_STATIONS.mock_response.overlay(degraded=True)
         return {"stations": stations[:8]}
 
-    def _search(self, entry: RouteCacheEntry, energy: str) -> List[Dict[str, Any]]:
+    def _search(
+        self, entry: RouteCacheEntry, energy: str, ahead_of_km: Optional[float] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Stations along the route, or None when Overpass could not be asked."""
+
+        if not is_available("overpass"):
+            logger.warning("FuelStationsToolRunner circuit open, returning fallback stations")
+            return None
         amenity = AMENITY_MAP.get(energy, "fuel")
-        geometry = self._extract_geometry(entry)
+        geometry = self._extract_geometry(entry, ahead_of_km)
         if not geometry:
             return FUEL_STATIONS.mock_response["stations"]
         bbox = self._bbox(geometry, padding=0.25)
         query = self._build_query(amenity, bbox)
         elements = self._fetch_overpass(query)
+        if elements is None:
+            return None
         if not elements:
             return FUEL_STATIONS.mock_response["stations"]
         summary = entry.raw.get("trip_summary", {})
@@ -57,23 +69,29 @@ class FuelStationsToolRunner:
             lat, lon = self._extract_coords(element)
             if lat is None or lon is None:
                 continue
+            route_km = entry.route_km(lat, lon)
+            if ahead_of_km is not None and route_km is not None and route_km < ahead_of_km:
+                continue
             eta = self._estimate_eta(start, lat, lon, avg_speed)
             stations.append(
                 {
                     "name": element.get("tags", {}).get("name", "Fuel stop"),
                     "amenities": self._collect_amenities(element.get("tags", {})),
                     "eta_from_start_minutes": int(eta),
+                    "route_km": round(route_km, 1) if route_km is not None else None,
                     "location": {"lat": lat, "lon": lon},
                 }
             )
         return sorted(stations, key=lambda s: s.get("eta_from_start_minutes", 0))
 
-    def _extract_geometry(self, entry: RouteCacheEntry) -> List[Tuple[float, float]]:
-        routes = entry.raw.get("routes", [])
-        if not routes:
-            return []
-        candidate = routes[0]
-        return candidate.get("geometry") or []
+    def _extract_geometry(self, entry: RouteCacheEntry, ahead_of_km: Optional[float] = None) -> List[Tuple[float, float]]:
+        geometry = entry.geometry
+        if not ahead_of_km or not geometry:
+            return geometry
+        # Only the corridor ahead of the driver needs to be searched.
+        cumulative = entry.cumulative_km
+        start = next((idx for idx, km in enumerate(cumulative) if km >= ahead_of_km), len(geometry) - 1)
+        return geometry[max(0, start - 1):]
 
     def _bbox(self, geometry: List[Tuple[float, float]], padding: float) -> Tuple[float, float, float, float]:
         lats = [lat for lat, _ in geometry]
@@ -96,15 +114,16 @@ class FuelStationsToolRunner:
             "out center 40;"
         )
 
-    def _fetch_overpass(self, query: str) -> List[Dict[str, Any]]:
+    def _fetch_overpass(self, query: str) -> Optional[List[Dict[str, Any]]]:
         try:
-            response = requests.post(OVERPASS_URL, data=query.encode("utf-8"), timeout=30)
-            response.raise_for_status()
+            with upstream_call("overpass"):
+                response = requests.post(OVERPASS_URL, data=query.encode("utf-8"), timeout=30)
+                response.raise_for_status()
             data = response.json()
             return data.get("elements", [])
         except Exception as exc:  # pragma: no cover - network
             logger.warning("Overpass query failed: %s", exc)
-            return []
+            return None
 
     def _extract_coords(self, element: Dict[str, Any]) -> Tuple[Optional[float], Optional[float]]:
         if "lat" in element and "lon" in element:
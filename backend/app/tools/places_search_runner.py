@@ -2,11 +2,11 @@ from __future__ import annotations
 
 import logging
 import os
-from copy import deepcopy
 from typing import Any, Dict, List, Optional
 
 import requests
 
+from app.services.upstream import is_available, upstream_call
 from app.tools.definitions import PLACES_SEARCH
 from route_planner.route_planer import geocode
 
@@ -19,7 +19,6 @@ FIELD_MASK = "places.displayName,places.formattedAddress,places.rating,places.us
 class PlacesSearchToolRunner:
     def __init__(self, max_per_category: int = 4) -> None:
         self._max_per_category = max_per_category
-        self._fallback = deepcopy(PLACES_SEARCH.mock_response)
 
     def __call__(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         location = arguments.get("location")
@@ -32,9 +31,14 @@ class PlacesSearchToolRunner:
         api_key = self._resolve_api_key()
         if not api_key:
             logger.warning("PlacesSearchToolRunner missing API key, returning fallback")
-            fallback = deepcopy(self._fallback)
-            fallback["warning"] = "GOOGLE_PLACES_API_KEY not configured"
-            return fallback
+            return PLACES_SEARCH.mock_response.overlay(
+                warning="GOOGLE_PLACES_API_KEY not configured", degraded=True
+            )
+        if not is_available("google_places"):
+            logger.warning("PlacesSearchToolRunner circuit open, returning fallback")
+            return PLACES_SEARCH.mock_response.overlay(
+                warning="Google Places is temporarily unavailable", degraded=True
+            )
 
         bias = self._geocode_safely(location)
         results: List[Dict[str, Any]] = []
@@ -68,8 +72,9 @@ class PlacesSearchToolRunner:
         if bias:
             payload["locationBias"] = {"circle": {"center": bias, "radius": 20000}}
         try:
-            response = requests.post(PLACES_TEXT_SEARCH, json=payload, headers=headers, timeout=15)
-            response.raise_for_status()
+            with upstream_call("google_places"):
+                response = requests.post(PLACES_TEXT_SEARCH, json=payload, headers=headers, timeout=15)
+                response.raise_for_status()
             data = response.json()
             return data.get("places", [])
         except Exception as exc:  # pragma: no cover - network
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from shapely.geometry import LineString, Point
 
@@ -26,10 +26,15 @@ class POINearRouteToolRunner:
         if not entry:
             logger.warning("POINearRouteToolRunner no cache for %s", route_id)
             return POI_NEAR_ROUTE.mock_response
-        suggestions = self._build_suggestions(entry, max_detour)
+        suggestions = self._build_suggestions(entry, max_detour, arguments.get("ahead_of_km"))
         return {"suggestions": suggestions[:10]}
 
-    def _build_suggestions(self, entry: RouteCacheEntry, max_detour: float) -> List[Dict[str, Any]]:
+    def _build_suggestions(
+        self,
+        entry: RouteCacheEntry,
+        max_detour: float,
+        ahead_of_km: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
         routes = entry.raw.get("routes", [])
         if not routes:
             return POI_NEAR_ROUTE.mock_response["suggestions"]
@@ -51,12 +56,16 @@ class POINearRouteToolRunner:
             distance_km = distance_deg * 111
             if distance_km > max_detour:
                 continue
+            route_km = entry.route_km(lat, lon)
+            if ahead_of_km is not None and route_km is not None and route_km < ahead_of_km:
+                continue
             detour = self._estimate_detour(entry, lat, lon)
             suggestions.append(
                 {
                     "name": poi.get("name", "Unnamed"),
                     "detour_km": round(detour, 1),
                     "reason": poi.get("category", "point of interest"),
+                    "route_km": round(route_km, 1) if route_km is not None else None,
                     "location": loc,
                 }
             )
@@ -2,10 +2,10 @@ from __future__ import annotations
 
 import logging
 import os
-from copy import deepcopy
 from typing import Any, Dict, List, Optional
 
 from app.services.route_cache import ROUTE_CACHE
+from app.services.single_flight import ROUTE_PLANNING_FLIGHT
 from app.tools.definitions import ROUTE_PLANNER
 from route_planner.route_planer import plan_trip
 
@@ -23,7 +23,6 @@ class RoutePlannerToolRunner:
             "services",
             "nature",
         ]
-        self._fallback_payload = deepcopy(ROUTE_PLANNER.mock_response)
 
     def __call__(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         return self.run(
@@ -36,12 +35,17 @@ class RoutePlannerToolRunner:
         logger.info("RoutePlannerTool -> %s → %s", origin, destination)
         try:
             api_key = self._resolve_api_key()
-            raw_result = plan_trip(
-                start=origin,
-                end=destination,
-                auto_discover_routes=True,
-                poi_categories=self._poi_categories,
-                api_key=api_key,
+            # Concurrent callers for the same pair (e.g. POI/fuel cache hydration)
+            # wait on one plan_trip run instead of starting their own.
+            raw_result = ROUTE_PLANNING_FLIGHT.do(
+                ROUTE_CACHE.key_for(origin, destination),
+                lambda: plan_trip(
+                    start=origin,
+                    end=destination,
+                    auto_discover_routes=True,
+                    poi_categories=self._poi_categories,
+                    api_key=api_key,
+                ),
             )
             if not raw_result.get("routes"):
                 raise ValueError("Planner did not return any candidates")
@@ -70,11 +74,11 @@ class RoutePlannerToolRunner:
             return payload
         except Exception as exc:  # pragma: no cover - guarded network code
             logger.exception("Route planner execution failed: %s", exc)
-            fallback = deepcopy(self._fallback_payload)
-            fallback["error"] = str(exc)
-            fallback["origin"] = origin
-            fallback["destination"] = destination
-            return fallback
+            return ROUTE_PLANNER.mock_response.overlay(
+                error=str(exc),
+                origin=origin,
+                destination=destination,
+            )
 
     def _resolve_api_key(self) -> Optional[str]:
         return (
@@ -100,16 +104,18 @@ class RoutePlannerToolRunner:
                 instruction += f" – {poi_hint}"
             legs.append(
                 {
+                    "name": route.get("name"),
                     "from": origin,
                     "to": destination,
                     "distance_km": route.get("distance_km"),
+                    "duration_minutes": route.get("duration_min"),
                     "instructions": instruction,
                     "waypoints": [
                         {"lat": wp[1], "lon": wp[0]} for wp in route.get("waypoints") or []
                     ],
                 }
             )
-        return legs or deepcopy(self._fallback_payload["legs"])
+        return legs or ROUTE_PLANNER.mock_response["legs"]
 
     def _format_poi_hint(self, categories: Dict[str, Dict[str, Any]]) -> str:
         if not categories:
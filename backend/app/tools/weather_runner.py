@@ -6,12 +6,24 @@ from typing import Any, Dict, List, Optional, Tuple
 
 import requests
 
+from app.services.forecast_cache import FORECAST_CACHE, Cell, HourlyForecast, cell_center, route_cells
+from app.services.gazetteer import lookup
+from app.services.route_cache import ROUTE_CACHE
+from app.services.upstream import upstream_call
 from app.tools.definitions import WEATHER
 from route_planner.route_planer import geocode
 
 logger = logging.getLogger(__name__)
 
 OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+# Keeps the comma-separated coordinate lists well within URL length limits.
+MAX_LOCATIONS_PER_REQUEST = 100
+# Upper bound on cells refreshed per warming pass.
+WARM_MAX_CELLS = 500
+# Route-sampling mode: default spacing, cap on samples per route, and speed used without route timing.
+DEFAULT_SAMPLE_KM = 20.0
+MAX_ROUTE_SAMPLES = 100
+DEFAULT_SPEED_KMH = 80.0
 WEATHER_CODES = {
     0: "jasno",
     1: "takmer jasno",
@@ -30,81 +42,159 @@ WEATHER_CODES = {
 }
 
 
+def _simulated(entry: Dict[str, Any], simulate: str) -> Dict[str, Any]:
+    return {
+        **entry,
+        "condition": "silny dazd a burky" if simulate == "storm" else "silny dazd",
+        "temp_c": 8,
+        "precip_probability": 90,
+    }
+
+
 class WeatherToolRunner:
     def __call__(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         waypoints = arguments.get("waypoints") or []
         simulate = arguments.get("simulate")
+        if arguments.get("route_id"):
+            return self._route_forecast(
+                arguments["route_id"],
+                float(arguments.get("sample_every_km") or DEFAULT_SAMPLE_KM),
+                float(arguments.get("ahead_of_km") or 0.0),
+                simulate,
+            )
         if simulate in {"rain", "storm"}:
-            return {
-                "forecast": [
-                    {
-                        "location": wp,
-                        "condition": "silny dazd a burky" if simulate == "storm" else "silny dazd",
-                        "temp_c": 8,
-                        "precip_probability": 90,
-                    }
-                    for wp in waypoints
-                ]
-            }
+            return {"forecast": [_simulated({"location": wp}, simulate) for wp in waypoints]}
         if not waypoints:
             return WEATHER.mock_response
+        located = self._resolve(waypoints)
+        hourly = self._forecasts([coords for _, coords in located])
         forecast = []
-        for waypoint in waypoints:
-            entry = self._forecast_for_location(waypoint)
+        for (waypoint, _), cell_forecast in zip(located, hourly):
+            entry = self._entry(waypoint, cell_forecast) if cell_forecast else None
             if entry:
                 forecast.append(entry)
-        return {"forecast": forecast or WEATHER.mock_response["forecast"]}
+        if not forecast:
+            return WEATHER.mock_response
+        result: Dict[str, Any] = {"forecast": forecast}
+        if len(forecast) < len(waypoints):
+            # Geocoding or Open-Meteo failed for some waypoints; keeps the answer out of the memo.
+            result["degraded"] = True
+        return result
 
-    def _forecast_for_location(self, location: str) -> Optional[Dict[str, Any]]:
-        try:
-            lon, lat = geocode(location)
-        except Exception as exc:
-            logger.warning("WeatherToolRunner geocode failed for %s: %s", location, exc)
-            return None
-        params = {
-            "latitude": lat,
-            "longitude": lon,
-            "hourly": "temperature_2m,precipitation_probability,weathercode",
-            "timezone": "auto",
-        }
-        try:
-            response = requests.get(OPEN_METEO_URL, params=params, timeout=15)
-            response.raise_for_status()
-            data = response.json()
-        except Exception as exc:  # pragma: no cover - network
-            logger.warning("Weather API failed for %s: %s", location, exc)
-            return None
+    def _route_forecast(
+        self, route_id: str, sample_every_km: float, ahead_of_km: float, simulate: Optional[str]
+    ) -> Dict[str, Any]:
+        """Forecast every ``sample_every_km`` along a cached route, at the hour the driver gets there.
 
-        return self._parse_forecast(location, data)
+        ETAs are pro rata of the route's total duration, counted from now at ``ahead_of_km``.
+        All sample cells are served from the forecast cache or fetched in one request.
+        """
 
-    def _parse_forecast(self, location: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        hourly = data.get("hourly") or {}
-        times = hourly.get("time") or []
-        temps = hourly.get("temperature_2m") or []
-        precip = hourly.get("precipitation_probability") or []
-        codes = hourly.get("weathercode") or []
-        if not times:
-            return None
+        entry = ROUTE_CACHE.get(route_id)
+        index = entry.index if entry else None
+        if index is None:
+            logger.warning("WeatherToolRunner no cached route %s", route_id)
+            return WEATHER.mock_response
+        step = max(sample_every_km, index.total_km / MAX_ROUTE_SAMPLES, 1.0)
+        start = min(max(ahead_of_km, 0.0), index.total_km)
+        kms = [start + idx * step for idx in range(int((index.total_km - start) // step) + 1)]
+        if index.total_km - kms[-1] > step / 4:
+            kms.append(index.total_km)
         now = datetime.now(timezone.utc)
-        horizon = now + timedelta(hours=6)
-        best_idx = 0
-        for idx, timestamp in enumerate(times):
+        samples = []
+        for km in kms:
+            minutes = index.minutes_between(start, km)
+            if minutes is None:
+                minutes = (km - start) / DEFAULT_SPEED_KMH * 60
+            samples.append({"route_km": round(km, 1), "eta_minutes": round(minutes), "location": f"km {round(km)}"})
+        if simulate in {"rain", "storm"}:
+            return {"route_id": route_id, "forecast": [_simulated(sample, simulate) for sample in samples]}
+
+        hourly = self._forecasts([index.point_at(km) for km in kms])
+        forecast = []
+        for sample, cell_forecast in zip(samples, hourly):
+            if cell_forecast is None:
+                continue
+            arrival = now + timedelta(minutes=sample["eta_minutes"])
+            weather = self._entry(sample["location"], cell_forecast, arrival)
+            if weather:
+                forecast.append({**sample, **weather})
+        result: Dict[str, Any] = {"route_id": route_id, "forecast": forecast}
+        if len(forecast) < len(samples):
+            result["degraded"] = True
+        return result
+
+    def warm_routes(self, max_cells: int = WARM_MAX_CELLS) -> int:
+        """Prefetch forecasts for the cells of all cached routes; returns the number of cells fetched."""
+
+        missing = FORECAST_CACHE.missing(route_cells(FORECAST_CACHE))[:max_cells]
+        return len(self._fetch_cells(missing))
+
+    def _resolve(self, waypoints: List[str]) -> List[Tuple[str, Tuple[float, float]]]:
+        """``(waypoint, (lat, lon))`` for every waypoint that can be placed; unknown ones are skipped."""
+
+        located = []
+        for waypoint in waypoints:
+            # Coordinates and gazetteer towns need no network; other names go through the cached geocoder.
+            coords = lookup(waypoint)
+            if coords is None:
+                try:
+                    lon, lat = geocode(waypoint)
+                except Exception as exc:
+                    logger.warning("WeatherToolRunner geocode failed for %s: %s", waypoint, exc)
+                    continue
+                coords = (lat, lon)
+            located.append((waypoint, coords))
+        return located
+
+    def _forecasts(self, coords: List[Tuple[float, float]]) -> List[Optional[HourlyForecast]]:
+        """Hourly forecast of each location's cell: cached ones locally, the rest in one request."""
+
+        cells = [FORECAST_CACHE.cell(lat, lon) for lat, lon in coords]
+        known = {cell: FORECAST_CACHE.get(cell) for cell in dict.fromkeys(cells)}
+        fetched = self._fetch_cells([cell for cell, forecast in known.items() if forecast is None])
+        return [known[cell] or fetched.get(cell) for cell in cells]
+
+    def _fetch_cells(self, cells: List[Cell]) -> Dict[Cell, HourlyForecast]:
+        """Fetch cell-centre forecasts with as few Open-Meteo requests as possible and cache them."""
+
+        fetched: Dict[Cell, HourlyForecast] = {}
+        for start in range(0, len(cells), MAX_LOCATIONS_PER_REQUEST):
+            batch = cells[start : start + MAX_LOCATIONS_PER_REQUEST]
+            centers = [cell_center(cell, FORECAST_CACHE.cell_deg) for cell in batch]
+            params = {
+                "latitude": ",".join(str(lat) for lat, _ in centers),
+                "longitude": ",".join(str(lon) for _, lon in centers),
+                "hourly": "temperature_2m,precipitation_probability,weathercode",
+                "timezone": "GMT",
+            }
             try:
-                slot = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-                if slot.tzinfo is None:
-                    slot = slot.replace(tzinfo=timezone.utc)
-            except ValueError:
+                with upstream_call("open_meteo"):
+                    response = requests.get(OPEN_METEO_URL, params=params, timeout=15)
+                    response.raise_for_status()
+                data = response.json()
+            except Exception as exc:  # pragma: no cover - network
+                logger.warning("Weather API failed for %d locations: %s", len(batch), exc)
                 continue
-            if now <= slot <= horizon:
-                best_idx = idx
-                break
-        temp = temps[best_idx] if best_idx < len(temps) else temps[0]
-        code = codes[best_idx] if best_idx < len(codes) else codes[0]
-        precip_val = precip[best_idx] if best_idx < len(precip) else None
-        condition = WEATHER_CODES.get(code, "neurčitá situácia")
+            # A single location comes back as an object, several as a list in request order.
+            payloads = data if isinstance(data, list) else [data]
+            for cell, payload in zip(batch, payloads):
+                forecast = HourlyForecast.from_open_meteo(payload)
+                if forecast is not None:
+                    FORECAST_CACHE.put(cell, forecast)
+                    fetched[cell] = forecast
+        return fetched
+
+    def _entry(
+        self, location: str, forecast: HourlyForecast, when: Optional[datetime] = None
+    ) -> Optional[Dict[str, Any]]:
+        slot = forecast.at(when)
+        if slot is None:
+            return None
+        temp, precip, code = slot
         return {
             "location": location,
-            "condition": condition,
+            "condition": WEATHER_CODES.get(code, "neurčitá situácia"),
             "temp_c": round(temp, 1) if temp is not None else None,
-            "precip_probability": precip_val,
+            "precip_probability": precip,
         }
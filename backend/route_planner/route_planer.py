@@ -5,10 +5,30 @@ import polyline
 import overpy
 import time
 import json
+from functools import lru_cache
 from typing import List, Tuple, Dict, Any, Optional
 from math import radians, cos, sin, asin, sqrt
 from shapely.geometry import LineString
 
+try:
+    from app.services.upstream import is_available, upstream_call
+except ImportError:  # standalone usage (e.g. example.py run from this folder)
+    from contextlib import contextmanager
+
+    class _UntrackedCall:
+        def mark_failure(self) -> None:
+            pass
+
+        def record_status(self, status_code: int) -> None:
+            pass
+
+    @contextmanager
+    def upstream_call(upstream: str):
+        yield _UntrackedCall()
+
+    def is_available(upstream: str) -> bool:
+        return True
+
 OSRM_CAR = "https://routing.openstreetmap.de/routed-car/route/v1/driving"
 OSRM_FOOT = "https://routing.openstreetmap.de/routed-foot/route/v1/walking"
 load_dotenv()
@@ -52,13 +72,18 @@ POI_CATEGORIES = {
             "score_multiplier": 1.8
             }
         }
+@lru_cache(maxsize=1024)
 def geocode(city: str) -> Tuple[float, float]:
     url = "https://nominatim.openstreetmap.org/search"
     params = {"q": city, "format": "json", "limit": 1}
     headers = {"User-Agent": "TripGuardian/1.0 (your-email@gmail.com)"}
-    time.sleep(1)
-    r = requests.get(url, params=params, headers=headers, timeout=10)
-    data = r.json()
+    # Nominatim politeness delay; skipped while the breaker is open so the call fails fast.
+    if is_available("nominatim"):
+        time.sleep(1)
+    with upstream_call("nominatim") as call:
+        r = requests.get(url, params=params, headers=headers, timeout=10)
+        call.record_status(r.status_code)
+        data = r.json()
     if data:
         return float(data[0]["lon"]), float(data[0]["lat"])
     raise ValueError(f"Cannot find {city}")
@@ -79,8 +104,10 @@ def get_osrm_routes(start_lonlat: Tuple[float, float],
             "steps": "false"
             }
     try:
-        r = requests.get(url, params=params, timeout=25)
-        data = r.json()
+        with upstream_call("osrm") as call:
+            r = requests.get(url, params=params, timeout=25)
+            call.record_status(r.status_code)
+            data = r.json()
         if data.get("code") != "Ok":
             return []
         routes = []
@@ -128,7 +155,8 @@ def generate_smart_scenarios(start_lonlat, end_lonlat, verbose=False) -> Dict[st
         if verbose:
             print("   Querying OpenStreetMap for cities...")
 
-        result = api.query(query)
+        with upstream_call("overpass"):
+            result = api.query(query)
         candidate_waypoints = {}
 
         if verbose and len(result.nodes) > 0:
@@ -238,8 +266,10 @@ def get_pois_along_route_google(
         url = "https://nominatim.openstreetmap.org/reverse"
         params = {"lat": lat, "lon": lon, "format": "json", "zoom": 10}
         try:
-            r = requests.get(url, params=params, timeout=5)
-            data = r.json()
+            with upstream_call("nominatim") as call:
+                r = requests.get(url, params=params, timeout=5)
+                call.record_status(r.status_code)
+                data = r.json()
             city = data.get("address", {})
             return city.get("city") or city.get("town") or city.get("village") or "Slovakia"
         except:
@@ -291,7 +321,9 @@ def get_pois_along_route_google(
                 det_headers = headers.copy()
                 det_headers["X-Goog-FieldMask"] = "rating,userRatingCount,priceLevel,photos,websiteUri,formattedAddress,currentOpeningHours"
 
-                det_r = requests.get(det_url, headers=det_headers, timeout=15)
+                with upstream_call("google_places") as call:
+                    det_r = requests.get(det_url, headers=det_headers, timeout=15)
+                    call.record_status(det_r.status_code)
 
                 if det_r.status_code != 200:
                     print(f"       ⚠️  Details fetch failed for {place.get('displayName', {}).get('text', 'Unknown')}: {det_r.status_code} - {det_r.text[:200]}")
@@ -373,7 +405,9 @@ def get_pois_along_route_google(
                     "languageCode": "sk"
                     }
             try:
-                r = requests.post(url, json=payload, headers=text_headers, timeout=20)
+                with upstream_call("google_places") as call:
+                    r = requests.post(url, json=payload, headers=text_headers, timeout=20)
+                    call.record_status(r.status_code)
                 if r.status_code != 200:
                     if verbose:
                         print(f"\n      ❌ Nearby API error {r.status_code} for {category}: {r.text[:150]}")
@@ -403,7 +437,9 @@ def get_pois_along_route_google(
                         }
 
                 try:
-                    r = requests.post(url, json=payload, headers=text_headers, timeout=20)
+                    with upstream_call("google_places") as call:
+                        r = requests.post(url, json=payload, headers=text_headers, timeout=20)
+                        call.record_status(r.status_code)
                     if r.status_code != 200:
                         if verbose:
                             print(f"\n      ❌ API error {r.status_code} for '{keyword_set}': {r.text[:150]}")